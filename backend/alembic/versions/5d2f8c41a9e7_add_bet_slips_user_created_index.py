@@ -0,0 +1,24 @@
+"""Add bet_slips (user_id, created_at) index
+
+Revision ID: 5d2f8c41a9e7
+Revises: 0add9ab66405
+Create Date: 2026-10-16 09:12:04.318527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8c41a9e7'
+down_revision = '0add9ab66405'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bet_slips_user_id_created_at', 'bet_slips', ['user_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bet_slips_user_id_created_at', table_name='bet_slips')
@@ -1,101 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+from datetime import datetime, timezone
+import asyncio
 import logging
 
-from app.database import get_db
-from app.models.user import User
+from app.database import AsyncSessionLocal, get_async_db
 from app.models.bet import BetSlip, PropBet, Analysis
 from app.services.claude_ocr import claude_ocr_service
+from app.services.image_storage import image_storage_service
 
 logger = logging.getLogger(__name__)
 from app.schemas.bet import (
     BetSlipCreate,
+    BetSlipPage,
+    PropBetCreate,
     BetSlipResponse,
     BetSlipWithAnalysis,
     PropBetResponse,
     AnalysisResponse,
     PropAnalysisDetail
 )
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user_id
 from app.core.analysis_engine import analysis_engine, PropBetData
 
 router = APIRouter(prefix="/bets", tags=["Bets"])
 
+MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB, matches the frontend limit
 
-@router.post("/upload", response_model=BetSlipResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "/upload",
+    response_model=BetSlipResponse,
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def upload_bet_slip_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
-    Upload a bet slip image and extract props using Claude OCR.
+    Upload a bet slip image; props are extracted with Claude OCR in the background.
+    
+    The slip is returned immediately with status ``ocr_pending``. Poll
+    ``GET /bets/{id}`` until it becomes ``pending`` (props extracted) or
+    ``ocr_failed``.
     
     Args:
+        background_tasks: Background task queue for the OCR job
         file: Uploaded image file
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
         
     Returns:
-        Created bet slip with extracted props
+        Created bet slip awaiting OCR
     """
-    # Validate file type
-    if not file.content_type or not file.content_type.startswith('image/'):
+    # Validate size and file type before encoding anything
+    if file.size and file.size > MAX_IMAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Image must be smaller than 10MB"
+        )
+    
+    # content_type is client-controlled; trust the file's magic bytes instead
+    media_type = _sniff_image_type(await file.read(16))
+    await file.seek(0)
+    if not media_type:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image"
+            detail="File must be a JPEG, PNG, GIF or WebP image"
         )
     
     try:
-        # Read image data
-        image_data = await file.read()
-        
-        # Extract props using Claude OCR
-        props_data = await claude_ocr_service.extract_props_from_image(
-            image_data, 
-            file.content_type
-        )
-        
-        if not props_data:
+        # Encode now: the upload is closed once the response has been sent. file.size is
+        # unset for chunked uploads, so the limit is also enforced while reading.
+        try:
+            base64_image = await claude_ocr_service.encode_image(file, max_size=MAX_IMAGE_SIZE)
+        except ValueError:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No prop bets could be extracted from the image. Please try manual entry."
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Image must be smaller than 10MB"
             )
         
         # Create bet slip
         bet_slip = BetSlip(
-            user_id=current_user.id,
-            name=f"Uploaded bet slip - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
+            user_id=current_user_id,
+            name=f"Uploaded bet slip - {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')}",
             slip_type="image",
-            status="pending"
+            status="ocr_pending"
         )
         
         db.add(bet_slip)
-        db.flush()
-        
-        # Create prop bets from extracted data
-        for prop_data in props_data:
-            prop_bet = PropBet(
-                bet_slip_id=bet_slip.id,
-                player_name=prop_data['player_name'],
-                stat_type=prop_data['stat_type'],
-                line=prop_data['line'],
-                over_under=prop_data['over_under'],
-                opponent_name=prop_data.get('opponent_name'),
-                odds=prop_data.get('odds')
-            )
-            db.add(prop_bet)
+        await db.commit()
+        set_committed_value(bet_slip, "prop_bets", [])
         
-        db.commit()
-        db.refresh(bet_slip)
-        
-        logger.info(f"Successfully created bet slip {bet_slip.id} with {len(props_data)} props from image")
+        background_tasks.add_task(
+            _process_bet_slip_image, bet_slip.id, base64_image, media_type
+        )
         
         return bet_slip
         
-    except Exception as e:
+    except (OSError, SQLAlchemyError) as e:
+        # Only I/O and database failures are wrapped; HTTPExceptions pass through as-is
+        await db.rollback()
         logger.error(f"Failed to process bet slip image: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -103,11 +119,91 @@ async def upload_bet_slip_image(
         )
 
 
-@router.post("/", response_model=BetSlipResponse, status_code=status.HTTP_201_CREATED)
+def _sniff_image_type(head: bytes) -> Optional[str]:
+    """Return the image MIME type from a file's leading bytes, if supported."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+async def _process_bet_slip_image(bet_slip_id: int, base64_image: str, mime_type: str) -> None:
+    """Run OCR for an uploaded bet slip and store the extracted props."""
+    async with AsyncSessionLocal() as db:
+        bet_slip = await db.get(BetSlip, bet_slip_id)
+        if not bet_slip:
+            return
+        
+        try:
+            # Store the image concurrently with OCR; joined before commit
+            upload_task = asyncio.create_task(
+                image_storage_service.upload_with_retry(
+                    image_storage_service.image_key(bet_slip_id, mime_type), base64_image
+                )
+            )
+            
+            try:
+                props_data = await claude_ocr_service.extract_props_from_base64(base64_image, mime_type)
+            except Exception as e:
+                logger.error(f"OCR failed for bet slip {bet_slip_id}: {e}")
+                props_data = []
+            
+            bet_slip.image_url = await upload_task
+            
+            # Extracted props go through the same validation as manual entry
+            props = []
+            for prop_data in props_data:
+                try:
+                    props.append(PropBetCreate(**prop_data))
+                except (TypeError, ValidationError) as e:
+                    logger.warning(f"Skipping invalid extracted prop {prop_data}: {e}")
+            
+            if not props:
+                bet_slip.status = "ocr_failed"
+                await db.commit()
+                return
+            
+            # Create prop bets from extracted data (single multi-row INSERT)
+            await db.execute(insert(PropBet), _prop_bet_rows(bet_slip_id, props))
+            bet_slip.status = "pending"
+            await db.commit()
+        except Exception:
+            # Never leave the slip stuck in ocr_pending; record the failure in a fresh transaction
+            logger.exception(f"Failed to store OCR results for bet slip {bet_slip_id}")
+            await db.rollback()
+            try:
+                await db.execute(
+                    update(BetSlip).where(BetSlip.id == bet_slip_id).values(status="ocr_failed")
+                )
+                await db.commit()
+            except SQLAlchemyError:
+                logger.exception(f"Failed to mark bet slip {bet_slip_id} as ocr_failed")
+                await db.rollback()
+            return
+        
+        logger.info(f"Successfully extracted {len(props)} props for bet slip {bet_slip_id}")
+
+
+def _prop_bet_rows(bet_slip_id: int, props: List[PropBetCreate]) -> List[dict]:
+    """Build the PropBet INSERT parameters for a bet slip's props."""
+    return [{"bet_slip_id": bet_slip_id, **prop.model_dump()} for prop in props]
+
+
+@router.post(
+    "/",
+    response_model=BetSlipResponse,
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_201_CREATED
+)
 async def create_bet_slip(
     bet_slip_data: BetSlipCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Create a new bet slip with prop bets.
@@ -115,73 +211,83 @@ async def create_bet_slip(
     Args:
         bet_slip_data: Bet slip creation data
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
         
     Returns:
         Created bet slip object
     """
     # Create bet slip
     bet_slip = BetSlip(
-        user_id=current_user.id,
+        user_id=current_user_id,
         name=bet_slip_data.name,
         slip_type="manual",
         status="pending"
     )
     
     db.add(bet_slip)
-    db.flush()  # Get the bet_slip.id
+    await db.flush()  # Get the bet_slip.id
     
-    # Create prop bets
-    for prop_data in bet_slip_data.prop_bets:
-        prop_bet = PropBet(
-            bet_slip_id=bet_slip.id,
-            player_name=prop_data.player_name,
-            stat_type=prop_data.stat_type,
-            line=prop_data.line,
-            over_under=prop_data.over_under,
-            opponent_name=prop_data.opponent_name,
-            game_date=prop_data.game_date,
-            odds=prop_data.odds
-        )
-        db.add(prop_bet)
+    # Create prop bets (single multi-row INSERT ... RETURNING)
+    prop_bets = await db.scalars(
+        insert(PropBet).returning(PropBet, sort_by_parameter_order=True),
+        _prop_bet_rows(bet_slip.id, bet_slip_data.prop_bets)
+    )
+    # The RETURNING rows are the full collection; no re-select needed for the response
+    set_committed_value(bet_slip, "prop_bets", prop_bets.all())
     
-    db.commit()
-    db.refresh(bet_slip)
+    await db.commit()
     
     return bet_slip
 
 
-@router.get("/", response_model=List[BetSlipResponse])
-def get_user_bet_slips(
+@router.get("/", response_model=BetSlipPage, response_model_exclude_unset=True)
+async def get_user_bet_slips(
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
-    Get all bet slips for the current user.
+    Get a page of bet slips for the current user.
     
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
         
     Returns:
-        List of bet slips
+        Page of bet slips with the user's total bet slip count
     """
-    bet_slips = db.query(BetSlip).filter(
-        BetSlip.user_id == current_user.id
-    ).order_by(BetSlip.created_at.desc()).offset(skip).limit(limit).all()
+    # COUNT(*) OVER () returns the total alongside the page in one round trip
+    result = await db.execute(
+        select(BetSlip, func.count().over().label("total"))
+        .options(selectinload(BetSlip.prop_bets))
+        .where(BetSlip.user_id == current_user_id)
+        .order_by(BetSlip.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = result.all()
     
-    return bet_slips
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Past the last page: no rows carry the total, so count directly
+        total = await db.scalar(
+            select(func.count()).select_from(BetSlip).where(BetSlip.user_id == current_user_id)
+        )
+    else:
+        total = 0
+    
+    return BetSlipPage(items=[row.BetSlip for row in rows], total=total)
 
 
-@router.get("/{bet_slip_id}", response_model=BetSlipWithAnalysis)
-def get_bet_slip(
+@router.get("/{bet_slip_id}", response_model=BetSlipWithAnalysis, response_model_exclude_unset=True)
+async def get_bet_slip(
     bet_slip_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Get a specific bet slip with analysis.
@@ -189,15 +295,16 @@ def get_bet_slip(
     Args:
         bet_slip_id: Bet slip ID
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
         
     Returns:
         Bet slip with analysis results
     """
-    bet_slip = db.query(BetSlip).filter(
-        BetSlip.id == bet_slip_id,
-        BetSlip.user_id == current_user.id
-    ).first()
+    bet_slip = await db.scalar(
+        select(BetSlip)
+        .options(selectinload(BetSlip.prop_bets), joinedload(BetSlip.analysis))
+        .where(BetSlip.id == bet_slip_id, BetSlip.user_id == current_user_id)
+    )
     
     if not bet_slip:
         raise HTTPException(
@@ -208,11 +315,11 @@ def get_bet_slip(
     return bet_slip
 
 
-@router.post("/{bet_slip_id}/analyze", response_model=AnalysisResponse)
+@router.post("/{bet_slip_id}/analyze", response_model=AnalysisResponse, response_model_exclude_unset=True)
 async def analyze_bet_slip(
     bet_slip_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Analyze a bet slip and generate recommendations.
@@ -220,16 +327,17 @@ async def analyze_bet_slip(
     Args:
         bet_slip_id: Bet slip ID to analyze
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
         
     Returns:
         Analysis results
     """
     # Fetch bet slip
-    bet_slip = db.query(BetSlip).filter(
-        BetSlip.id == bet_slip_id,
-        BetSlip.user_id == current_user.id
-    ).first()
+    bet_slip = await db.scalar(
+        select(BetSlip)
+        .options(selectinload(BetSlip.prop_bets), joinedload(BetSlip.analysis))
+        .where(BetSlip.id == bet_slip_id, BetSlip.user_id == current_user_id)
+    )
     
     if not bet_slip:
         raise HTTPException(
@@ -237,6 +345,13 @@ async def analyze_bet_slip(
             detail="Bet slip not found"
         )
     
+    # Props are not known until OCR has finished successfully
+    if bet_slip.status in ("ocr_pending", "ocr_failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bet slip cannot be analyzed while its status is {bet_slip.status}"
+        )
+
     # Check if already analyzed
     if bet_slip.status == "analyzed" and bet_slip.analysis:
         # Return existing analysis
@@ -264,7 +379,8 @@ async def analyze_bet_slip(
     # Convert PropAnalysis objects to dicts
     prop_analyses_dict = {}
     for prop_analysis in analysis_results["prop_analyses"]:
-        prop_analyses_dict[prop_analysis.prop_id] = {
+        # JSON object keys are strings; store them that way so reads need no cast
+        prop_analyses_dict[str(prop_analysis.prop_id)] = {
             "confidence_score": prop_analysis.confidence_score,
             "hit_rate_last_10": prop_analysis.hit_rate_last_10,
             "average_stat": prop_analysis.average_stat,
@@ -275,49 +391,36 @@ async def analyze_bet_slip(
             "analysis_notes": prop_analysis.analysis_notes
         }
     
-    # Check if analysis already exists
-    existing_analysis = db.query(Analysis).filter(
-        Analysis.bet_slip_id == bet_slip_id
-    ).first()
-    
-    if existing_analysis:
-        # Update existing
-        existing_analysis.overall_confidence = analysis_results["overall_confidence"]
-        existing_analysis.recommended_bets = analysis_results["recommended_bets"]
-        existing_analysis.parlay_suggestions = analysis_results["parlay_suggestions"]
-        existing_analysis.risk_assessment = analysis_results["risk_assessment"]
-        existing_analysis.prop_analyses = prop_analyses_dict
-    else:
-        # Create new
-        analysis = Analysis(
-            bet_slip_id=bet_slip_id,
-            overall_confidence=analysis_results["overall_confidence"],
-            recommended_bets=analysis_results["recommended_bets"],
-            parlay_suggestions=analysis_results["parlay_suggestions"],
-            risk_assessment=analysis_results["risk_assessment"],
-            prop_analyses=prop_analyses_dict
-        )
-        db.add(analysis)
+    # Insert or replace the slip's analysis in one statement (bet_slip_id is unique)
+    payload = {
+        "overall_confidence": analysis_results["overall_confidence"],
+        "recommended_bets": analysis_results["recommended_bets"],
+        "parlay_suggestions": analysis_results["parlay_suggestions"],
+        "risk_assessment": analysis_results["risk_assessment"],
+        "prop_analyses": prop_analyses_dict,
+    }
+    dialect_insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    upsert = dialect_insert(Analysis).values(bet_slip_id=bet_slip_id, **payload)
+    upsert = upsert.on_conflict_do_update(index_elements=[Analysis.bet_slip_id], set_=payload)
+    analysis = await db.scalar(
+        upsert.returning(Analysis),
+        execution_options={"populate_existing": True}
+    )
     
     # Update bet slip status
     bet_slip.status = "analyzed"
-    bet_slip.analyzed_at = datetime.utcnow()
+    bet_slip.analyzed_at = func.now()  # database clock, fetched back via eager_defaults
     
-    db.commit()
+    await db.commit()
     
-    if existing_analysis:
-        db.refresh(existing_analysis)
-        return _format_analysis_response(existing_analysis, bet_slip.prop_bets)
-    else:
-        db.refresh(analysis)
-        return _format_analysis_response(analysis, bet_slip.prop_bets)
+    return _format_analysis_response(analysis, bet_slip.prop_bets)
 
 
 @router.delete("/{bet_slip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_bet_slip(
+async def delete_bet_slip(
     bet_slip_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Delete a bet slip.
@@ -325,12 +428,14 @@ def delete_bet_slip(
     Args:
         bet_slip_id: Bet slip ID to delete
         db: Database session
-        current_user: Current authenticated user
+        current_user_id: ID of the current authenticated user
     """
-    bet_slip = db.query(BetSlip).filter(
-        BetSlip.id == bet_slip_id,
-        BetSlip.user_id == current_user.id
-    ).first()
+    # Cascaded children must be loaded up front; async sessions cannot lazy-load them
+    bet_slip = await db.scalar(
+        select(BetSlip)
+        .options(selectinload(BetSlip.prop_bets), joinedload(BetSlip.analysis))
+        .where(BetSlip.id == bet_slip_id, BetSlip.user_id == current_user_id)
+    )
     
     if not bet_slip:
         raise HTTPException(
@@ -338,26 +443,25 @@ def delete_bet_slip(
             detail="Bet slip not found"
         )
     
-    db.delete(bet_slip)
-    db.commit()
+    await db.delete(bet_slip)
+    await db.commit()
     
     return None
 
 
 def _format_analysis_response(analysis: Analysis, prop_bets: List[PropBet]) -> AnalysisResponse:
     """Format analysis database object into response schema."""
-    # Build prop bet lookup
-    prop_lookup = {prop.id: prop for prop in prop_bets}
+    # Build prop bet lookup (keyed like the stored prop_analyses JSON)
+    prop_lookup = {str(prop.id): prop for prop in prop_bets}
     
     # Format individual prop analyses
     prop_analyses = []
     for prop_id_str, prop_analysis_data in (analysis.prop_analyses or {}).items():
-        prop_id = int(prop_id_str)
-        prop = prop_lookup.get(prop_id)
+        prop = prop_lookup.get(prop_id_str)
         
         if prop:
             prop_analysis = PropAnalysisDetail(
-                prop_id=prop_id,
+                prop_id=prop.id,
                 player_name=prop.player_name,
                 stat_type=prop.stat_type,
                 line=prop.line,
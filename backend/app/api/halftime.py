@@ -3,13 +3,18 @@ Halftime Analysis API endpoints.
 
 Provides real-time halftime analysis for live NBA games.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
 import logging
+import time
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import get_current_user
 from app.models.user import User
 from app.models.live_analysis import LiveAnalysisSnapshot, LivePropSuggestion
@@ -18,6 +23,7 @@ from app.services.balldontlie import balldontlie_service
 from app.services.bdl_analytics import BDLAnalytics
 from app.core.halftime_engine import HalftimeAnalysisEngine
 from app.core.game_totals_engine import GameTotalsEngine
+from app.utils.responses import PydanticResponse, conditional_response, etag_matches, not_modified
 
 # Initialize BDL analytics and inject into halftime engine
 bdl_analytics = BDLAnalytics(balldontlie_service)
@@ -40,144 +46,69 @@ from app.schemas.halftime import (
 
 logger = logging.getLogger(__name__)
 
+# Confidence score at which a suggestion counts as high confidence
+HIGH_CONFIDENCE_THRESHOLD = 75
+
+# Recent totals projections keyed by (game_id, reference_line) -> (payload, computed_at).
+# Live scores only refresh every scoreboard interval, so repeat polls inside it reuse the result.
+TOTALS_CACHE_TTL = live_data_client.SCOREBOARD_REFRESH_SECONDS
+TOTALS_CACHE_MAX = 256
+_totals_cache: Dict[Tuple[str, Optional[float]], Tuple[Dict[str, Any], float]] = {}
+
 router = APIRouter(prefix="/halftime", tags=["halftime"])
 
 
 def _convert_player_stats(stats: LivePlayerStats) -> LivePlayerStatsResponse:
-    """Convert LivePlayerStats dataclass to response schema."""
-    return LivePlayerStatsResponse(
-        player_id=stats.player_id,
-        player_name=stats.player_name,
-        team_id=stats.team_id,
-        team_abbreviation=stats.team_abbreviation,
-        minutes=stats.minutes,
-        minutes_float=stats.minutes_float,
-        points=stats.points,
-        rebounds=stats.rebounds,
-        assists=stats.assists,
-        steals=stats.steals,
-        blocks=stats.blocks,
-        turnovers=stats.turnovers,
-        fouls=stats.fouls,
-        fg_made=stats.fg_made,
-        fg_attempted=stats.fg_attempted,
-        fg_pct=stats.fg_pct,
-        fg3_made=stats.fg3_made,
-        fg3_attempted=stats.fg3_attempted,
-        fg3_pct=stats.fg3_pct,
-        ft_made=stats.ft_made,
-        ft_attempted=stats.ft_attempted,
-        ft_pct=stats.ft_pct,
-        plus_minus=stats.plus_minus,
-        starter=stats.starter
-    )
+    """Convert LivePlayerStats dataclass to response schema (already typed, so not re-validated)."""
+    return LivePlayerStatsResponse.model_construct(**stats.__dict__)
 
 
-@router.get("/games/live", response_model=List[LiveGameResponse])
-async def get_live_games(
-):
-    """Get all live NBA games currently in progress."""
-    try:
-        games = await live_data_client.get_live_games()
-        return [
-            LiveGameResponse(
-                game_id=g.game_id,
-                game_status=g.game_status,
-                game_status_text=g.game_status_text,
-                period=g.period,
-                game_clock=g.game_clock,
-                home_team_id=g.home_team_id,
-                home_team_name=g.home_team_name,
-                home_team_abbr=g.home_team_abbr,
-                home_score=g.home_score,
-                away_team_id=g.away_team_id,
-                away_team_name=g.away_team_name,
-                away_team_abbr=g.away_team_abbr,
-                away_score=g.away_score,
-                game_date=g.game_date,
-                game_time_utc=g.game_time_utc,
-                is_halftime=g.is_halftime,
-                score_differential=g.score_differential,
-                total_score=g.total_score
-            )
-            for g in games
-        ]
-    except Exception as e:
-        logger.error(f"Error fetching live games: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch live games")
-
+def _make_games_endpoint(name: str, fetch, label: str, doc: str):
+    """
+    Build a list-games endpoint around a live_data_client fetch method.
 
-@router.get("/games/today", response_model=List[LiveGameResponse])
-async def get_todays_games(
-):
-    """Get all of today's NBA games (scheduled, live, and completed)."""
-    try:
-        games = await live_data_client.get_todays_games()
-        return [
-            LiveGameResponse(
-                game_id=g.game_id,
-                game_status=g.game_status,
-                game_status_text=g.game_status_text,
-                period=g.period,
-                game_clock=g.game_clock,
-                home_team_id=g.home_team_id,
-                home_team_name=g.home_team_name,
-                home_team_abbr=g.home_team_abbr,
-                home_score=g.home_score,
-                away_team_id=g.away_team_id,
-                away_team_name=g.away_team_name,
-                away_team_abbr=g.away_team_abbr,
-                away_score=g.away_score,
-                game_date=g.game_date,
-                game_time_utc=g.game_time_utc,
-                is_halftime=g.is_halftime,
-                score_differential=g.score_differential,
-                total_score=g.total_score
-            )
-            for g in games
-        ]
-    except Exception as e:
-        logger.error(f"Error fetching today's games: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch today's games")
+    LiveGameData.to_dict() is already response-shaped, so the handler returns ORJSONResponse
+    directly and skips FastAPI's validation and jsonable_encoder passes.
+    """
+    async def handler():
+        try:
+            games = await fetch()
+            return ORJSONResponse([g.to_dict() for g in games])
+        except Exception as e:
+            logger.error(f"Error fetching {label}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch {label}")
+
+    handler.__name__ = name
+    handler.__doc__ = doc
+    return handler
+
+
+get_live_games = router.get("/games/live", response_model=List[LiveGameResponse])(
+    _make_games_endpoint(
+        "get_live_games", live_data_client.get_live_games, "live games",
+        "Get all live NBA games currently in progress."
+    )
+)
 
+get_todays_games = router.get("/games/today", response_model=List[LiveGameResponse])(
+    _make_games_endpoint(
+        "get_todays_games", live_data_client.get_cached_todays_games, "today's games",
+        "Get all of today's NBA games (scheduled, live, and completed)."
+    )
+)
 
-@router.get("/games/halftime", response_model=List[LiveGameResponse])
-async def get_halftime_games(
-):
-    """Get only games that are currently at halftime."""
-    try:
-        games = await live_data_client.get_halftime_games()
-        return [
-            LiveGameResponse(
-                game_id=g.game_id,
-                game_status=g.game_status,
-                game_status_text=g.game_status_text,
-                period=g.period,
-                game_clock=g.game_clock,
-                home_team_id=g.home_team_id,
-                home_team_name=g.home_team_name,
-                home_team_abbr=g.home_team_abbr,
-                home_score=g.home_score,
-                away_team_id=g.away_team_id,
-                away_team_name=g.away_team_name,
-                away_team_abbr=g.away_team_abbr,
-                away_score=g.away_score,
-                game_date=g.game_date,
-                game_time_utc=g.game_time_utc,
-                is_halftime=g.is_halftime,
-                score_differential=g.score_differential,
-                total_score=g.total_score
-            )
-            for g in games
-        ]
-    except Exception as e:
-        logger.error(f"Error fetching halftime games: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch halftime games")
+get_halftime_games = router.get("/games/halftime", response_model=List[LiveGameResponse])(
+    _make_games_endpoint(
+        "get_halftime_games", live_data_client.get_halftime_games, "halftime games",
+        "Get only games that are currently at halftime."
+    )
+)
 
 
 @router.get("/games/{game_id}/boxscore", response_model=LiveBoxScoreResponse)
 async def get_game_boxscore(
     game_id: str,
+    request: Request,
 ):
     """Get the live box score for a specific game."""
     try:
@@ -189,15 +120,15 @@ async def get_game_boxscore(
         home_team = box_score.get('home_team', {})
         away_team = box_score.get('away_team', {})
 
-        return LiveBoxScoreResponse(
+        response = PydanticResponse(LiveBoxScoreResponse.model_construct(
             game_id=game_id,
-            home_team=TeamInfoResponse(
+            home_team=TeamInfoResponse.model_construct(
                 team_id=home_team.get('team_id', 0),
                 team_name=home_team.get('team_name', ''),
                 team_abbr=home_team.get('team_abbr', ''),
                 score=home_team.get('score', 0)
             ),
-            away_team=TeamInfoResponse(
+            away_team=TeamInfoResponse.model_construct(
                 team_id=away_team.get('team_id', 0),
                 team_name=away_team.get('team_name', ''),
                 team_abbr=away_team.get('team_abbr', ''),
@@ -205,7 +136,8 @@ async def get_game_boxscore(
             ),
             home_players=[_convert_player_stats(p) for p in box_score.get('home', [])],
             away_players=[_convert_player_stats(p) for p in box_score.get('away', [])]
-        )
+        ))
+        return conditional_response(request, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -252,20 +184,25 @@ async def get_halftime_suggestions(
 
         suggestions = analysis.get('suggestions', [])
 
-        # Apply filters
-        filtered = [
-            s for s in suggestions
-            if s['confidence_score'] >= min_confidence
-            and (prop_type is None or s['prop_type'].lower() == prop_type.lower())
-        ]
+        # Apply filters, counting high-confidence picks in the same pass
+        wanted_type = prop_type.lower() if prop_type is not None else None
+        filtered = []
+        high_confidence_count = 0
+        for s in suggestions:
+            confidence = s['confidence_score']
+            if confidence < min_confidence:
+                continue
+            if wanted_type is not None and s['prop_type'].lower() != wanted_type:
+                continue
+            filtered.append(PropSuggestionResponse(**s))
+            if confidence >= HIGH_CONFIDENCE_THRESHOLD:
+                high_confidence_count += 1
 
         return HalftimeSuggestionsResponse(
             game_id=game_id,
-            suggestions=[
-                PropSuggestionResponse(**s) for s in filtered
-            ],
+            suggestions=filtered,
             total_count=len(filtered),
-            high_confidence_count=len([s for s in filtered if s['confidence_score'] >= 75]),
+            high_confidence_count=high_confidence_count,
             filters_applied={
                 'min_confidence': min_confidence,
                 'prop_type': prop_type
@@ -294,11 +231,20 @@ async def get_game_totals_analysis(
     - Per-team quarter-by-quarter projections
     - Point spread prediction
     - Over/Under recommendation with edge
+
+    Results are reused for one scoreboard refresh interval per game and line.
     """
+    cache_key = (game_id, reference_line)
+    cached = _totals_cache.get(cache_key)
+    if cached and time.time() - cached[1] < TOTALS_CACHE_TTL:
+        return ORJSONResponse(cached[0])
+
     try:
-        # Get live game data
-        games = await live_data_client.get_todays_games()
-        game_data = next((g for g in games if g.game_id == game_id), None)
+        # Get live game data (scoreboard and box score are independent, so fetch together)
+        game_data, box_score = await asyncio.gather(
+            live_data_client.get_game_by_id(game_id),
+            live_data_client.get_live_box_score(game_id)
+        )
 
         if not game_data:
             raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
@@ -306,17 +252,13 @@ async def get_game_totals_analysis(
         if game_data.game_status == 1:
             raise HTTPException(status_code=400, detail="Game has not started yet")
 
-        box_score = await live_data_client.get_live_box_score(game_id)
-
         if not box_score.get('home') and not box_score.get('away'):
             raise HTTPException(status_code=404, detail="No box score data available")
 
         # Get team ratings from halftime engine (reuse existing method)
-        home_ratings = await halftime_engine._get_team_ratings(
-            game_data.home_team_id, game_data.home_team_abbr
-        )
-        away_ratings = await halftime_engine._get_team_ratings(
-            game_data.away_team_id, game_data.away_team_abbr
+        home_ratings, away_ratings = await asyncio.gather(
+            halftime_engine._get_team_ratings(game_data.home_team_id, game_data.home_team_abbr),
+            halftime_engine._get_team_ratings(game_data.away_team_id, game_data.away_team_abbr)
         )
 
         # Run enhanced totals analysis
@@ -330,8 +272,13 @@ async def get_game_totals_analysis(
             reference_line=reference_line
         )
 
-        # Convert dataclass to dict for Pydantic
-        return _enhanced_totals_to_response(result)
+        payload = result.to_dict()
+        _totals_cache.pop(cache_key, None)
+        if len(_totals_cache) >= TOTALS_CACHE_MAX:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del _totals_cache[next(iter(_totals_cache))]
+        _totals_cache[cache_key] = (payload, time.time())
+        return ORJSONResponse(payload)
 
     except HTTPException:
         raise
@@ -340,17 +287,10 @@ async def get_game_totals_analysis(
         raise HTTPException(status_code=500, detail="Failed to analyze game totals")
 
 
-def _enhanced_totals_to_response(result) -> dict:
-    """Convert EnhancedGameTotalProjection dataclass to response dict."""
-    from dataclasses import asdict
-    data = asdict(result)
-    return data
-
-
 @router.post("/games/{game_id}/snapshot", response_model=SnapshotResponse)
 async def save_analysis_snapshot(
     game_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Save a snapshot of the current halftime analysis.
@@ -365,6 +305,27 @@ async def save_analysis_snapshot(
         game_total = analysis.get('game_total_analysis', {})
         suggestions = analysis.get('suggestions', [])
 
+        # Build the suggestion rows and count high-confidence picks in one pass
+        rows = []
+        high_confidence_count = 0
+        for suggestion in suggestions:
+            key_factors = suggestion.get('key_factors', ())
+            high_confidence_count += suggestion['confidence_score'] >= HIGH_CONFIDENCE_THRESHOLD
+            rows.append({
+                'player_name': suggestion['player_name'],
+                'team_abbreviation': suggestion['team_abbreviation'],
+                'prop_type': suggestion['prop_type'],
+                'prop_line': suggestion['prop_line'],
+                'over_under': 'over',
+                'first_half_value': suggestion['current_value'],
+                'first_half_minutes': 0,  # Would need to look up
+                'projected_final': suggestion['projected_final'],
+                'confidence_score': suggestion['confidence_score'],
+                'recommendation': suggestion['recommendation'],
+                'foul_trouble': any('foul trouble' in f.lower() for f in key_factors),
+                'blowout_warning': any('blowout' in f.lower() for f in key_factors),
+            })
+
         # Create snapshot (using default user_id=1 since auth is disabled)
         snapshot = LiveAnalysisSnapshot(
             user_id=1,
@@ -376,35 +337,21 @@ async def save_analysis_snapshot(
             period=game_info.get('period', 0),
             game_clock=game_info.get('game_clock', ''),
             analysis_data=analysis,
-            total_suggestions=len(suggestions),
-            high_confidence_count=len([s for s in suggestions if s['confidence_score'] >= 75]),
+            total_suggestions=len(rows),
+            high_confidence_count=high_confidence_count,
             projected_game_total=game_total.get('projected_final_total'),
             projected_q3_total=game_total.get('projected_q3_total'),
         )
         db.add(snapshot)
-        db.flush()
+        await db.flush()
 
-        # Save individual suggestions for tracking
-        for suggestion in suggestions:
-            prop_suggestion = LivePropSuggestion(
-                snapshot_id=snapshot.id,
-                player_name=suggestion['player_name'],
-                team_abbreviation=suggestion['team_abbreviation'],
-                prop_type=suggestion['prop_type'],
-                prop_line=suggestion['prop_line'],
-                over_under='over',
-                first_half_value=suggestion['current_value'],
-                first_half_minutes=0,  # Would need to look up
-                projected_final=suggestion['projected_final'],
-                confidence_score=suggestion['confidence_score'],
-                recommendation=suggestion['recommendation'],
-                foul_trouble='foul trouble' in ' '.join(suggestion.get('key_factors', [])).lower(),
-                blowout_warning='blowout' in ' '.join(suggestion.get('key_factors', [])).lower(),
-            )
-            db.add(prop_suggestion)
-
-        db.commit()
-        db.refresh(snapshot)
+        # Save individual suggestions for tracking (single multi-row INSERT)
+        for row in rows:
+            row['snapshot_id'] = snapshot.id
+        if rows:
+            await db.execute(insert(LivePropSuggestion), rows)
+
+        await db.commit()
 
         return SnapshotResponse(
             id=snapshot.id,
@@ -422,57 +369,78 @@ async def save_analysis_snapshot(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error saving snapshot for game {game_id}: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to save snapshot")
 
 
 @router.get("/snapshots", response_model=List[SnapshotResponse])
 async def get_user_snapshots(
+    request: Request,
     limit: int = Query(default=20, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's saved analysis snapshots."""
-    snapshots = db.query(LiveAnalysisSnapshot)\
-        .filter(LiveAnalysisSnapshot.user_id == 1)\
-        .order_by(LiveAnalysisSnapshot.snapshot_time.desc())\
-        .limit(limit)\
-        .all()
-
-    return [
-        SnapshotResponse(
-            id=s.id,
-            game_id=s.game_id,
-            home_team=s.home_team,
-            away_team=s.away_team,
-            home_score=s.home_score,
-            away_score=s.away_score,
-            total_suggestions=s.total_suggestions,
-            high_confidence_count=s.high_confidence_count,
-            snapshot_time=s.snapshot_time
+    # Select only the summary columns so the analysis_data JSON blob is never loaded,
+    # and hand the rows straight to orjson (which encodes datetimes natively)
+    result = await db.execute(
+        select(
+            LiveAnalysisSnapshot.id,
+            LiveAnalysisSnapshot.game_id,
+            LiveAnalysisSnapshot.home_team,
+            LiveAnalysisSnapshot.away_team,
+            LiveAnalysisSnapshot.home_score,
+            LiveAnalysisSnapshot.away_score,
+            LiveAnalysisSnapshot.total_suggestions,
+            LiveAnalysisSnapshot.high_confidence_count,
+            LiveAnalysisSnapshot.snapshot_time,
         )
-        for s in snapshots
-    ]
+        .where(LiveAnalysisSnapshot.user_id == 1)
+        .order_by(LiveAnalysisSnapshot.snapshot_time.desc())
+        .limit(limit)
+    )
+
+    return conditional_response(request, ORJSONResponse([row._asdict() for row in result]))
 
 
 @router.get("/snapshots/{snapshot_id}", response_model=SnapshotDetailResponse)
 async def get_snapshot_detail(
     snapshot_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed snapshot including full analysis data."""
-    snapshot = db.query(LiveAnalysisSnapshot)\
-        .filter(
+    # Snapshots never change once saved, so id + snapshot_time identifies the representation
+    # and a revalidating client can be answered without loading the analysis blob
+    result = await db.execute(
+        select(LiveAnalysisSnapshot.snapshot_time).where(
             LiveAnalysisSnapshot.id == snapshot_id,
             LiveAnalysisSnapshot.user_id == 1
-        )\
-        .first()
+        )
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    saved_at = int(row.snapshot_time.timestamp()) if row.snapshot_time else 0
+    etag = f'W/"{snapshot_id}-{saved_at}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    snapshot = await db.scalar(
+        select(LiveAnalysisSnapshot)
+        .options(undefer(LiveAnalysisSnapshot.analysis_data))
+        .where(
+            LiveAnalysisSnapshot.id == snapshot_id,
+            LiveAnalysisSnapshot.user_id == 1
+        )
+    )
 
     if not snapshot:
         raise HTTPException(status_code=404, detail="Snapshot not found")
 
     suggestions = snapshot.analysis_data.get('suggestions', [])
 
-    return SnapshotDetailResponse(
+    response = PydanticResponse(SnapshotDetailResponse(
         id=snapshot.id,
         game_id=snapshot.game_id,
         home_team=snapshot.home_team,
@@ -484,26 +452,32 @@ async def get_snapshot_detail(
         snapshot_time=snapshot.snapshot_time,
         analysis_data=snapshot.analysis_data,
         suggestions=[PropSuggestionResponse(**s) for s in suggestions]
-    )
+    ))
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 @router.delete("/snapshots/{snapshot_id}")
 async def delete_snapshot(
     snapshot_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a saved snapshot."""
-    snapshot = db.query(LiveAnalysisSnapshot)\
-        .filter(
+    # Cascaded suggestions must be loaded up front; async sessions cannot lazy-load them
+    snapshot = await db.scalar(
+        select(LiveAnalysisSnapshot)
+        .options(selectinload(LiveAnalysisSnapshot.suggestions))
+        .where(
             LiveAnalysisSnapshot.id == snapshot_id,
             LiveAnalysisSnapshot.user_id == 1
-        )\
-        .first()
+        )
+    )
 
     if not snapshot:
         raise HTTPException(status_code=404, detail="Snapshot not found")
 
-    db.delete(snapshot)
-    db.commit()
+    await db.delete(snapshot)
+    await db.commit()
 
     return {"message": "Snapshot deleted successfully"}
@@ -1,3 +1,4 @@
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 import os
@@ -26,6 +27,9 @@ class Settings(BaseSettings):
     # Anthropic API for OCR
     ANTHROPIC_API_KEY: str = ""  # Optional, for image upload feature
     
+    # Uploaded bet slip images
+    IMAGE_UPLOAD_DIR: str = ""  # Optional, images are not kept when empty
+    
     # Server
     PORT: int = 8000
 
@@ -35,7 +39,7 @@ class Settings(BaseSettings):
     # Rate Limiting
     API_RATE_LIMIT_PER_MINUTE: int = 30
     
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
@@ -44,4 +48,10 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings (reads the environment once)."""
+    return Settings()
+
+
+settings = get_settings()
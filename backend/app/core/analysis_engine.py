@@ -1,15 +1,51 @@
-from typing import List, Dict, Optional
+import asyncio
+import bisect
+import heapq
+import time
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import logging
 
 from app.services.balldontlie import balldontlie_service
 
 logger = logging.getLogger(__name__)
 
+# Prop stat type -> BallDontLie stat key
+STAT_TYPE_MAP = {
+    'points': 'pts',
+    'pts': 'pts',
+    'rebounds': 'reb',
+    'reb': 'reb',
+    'assists': 'ast',
+    'ast': 'ast',
+    'threes': 'fg3m',
+    '3pm': 'fg3m',
+    'steals': 'stl',
+    'stl': 'stl',
+    'blocks': 'blk',
+    'blk': 'blk'
+}
 
-@dataclass
+# Games that make up the recent-trend window
+RECENT_TREND_GAMES = 5
+
+# Confidence points per unit of each factor score
+FACTOR_WEIGHTS = (
+    ('recent_trend', 8),
+    ('consistency', 10),
+    ('home_away', 5),
+    ('rest', 3),
+    ('playing_time', 8),
+)
+
+# Confidence cutoffs (ascending); a score at or above each cutoff moves up one label
+RECOMMENDATION_THRESHOLDS = (30, 45, 58, 70)
+RECOMMENDATION_LABELS = ('strong_avoid', 'avoid', 'neutral', 'bet', 'strong_bet')
+
+
+@dataclass(slots=True)
 class PropBetData:
     """Data class for prop bet information."""
     prop_id: int
@@ -22,7 +58,7 @@ class PropBetData:
     game_date: Optional[datetime]
 
 
-@dataclass
+@dataclass(slots=True)
 class PropAnalysis:
     """Analysis results for a single prop bet."""
     prop_id: int
@@ -43,23 +79,16 @@ class PropAnalysis:
 class AnalysisEngine:
     """Core analysis engine for prop bet evaluation."""
     
-    STAT_TYPE_MAP = {
-        'points': 'pts',
-        'pts': 'pts',
-        'rebounds': 'reb',
-        'reb': 'reb',
-        'assists': 'ast',
-        'ast': 'ast',
-        'threes': 'fg3m',
-        '3pm': 'fg3m',
-        'steals': 'stl',
-        'stl': 'stl',
-        'blocks': 'blk',
-        'blk': 'blk'
-    }
+    # Upper bound on props fetching stats at once (keeps us under API rate limits)
+    MAX_CONCURRENT_PROPS = 20
+    # Upper bound on cached prop analyses; expired, then oldest, entries are evicted beyond this
+    MAX_CACHE_ENTRIES = 2048
     
     def __init__(self):
         self.service = balldontlie_service
+        # Keyed by (player_id, stat_key, line, over_under, game_date, opponent)
+        self._cache: Dict[Tuple, Tuple[PropAnalysis, float]] = {}
+        self._cache_ttl = 900  # 15 minutes
     
     async def analyze_prop(self, prop: PropBetData) -> PropAnalysis:
         """
@@ -71,7 +100,20 @@ class AnalysisEngine:
         Returns:
             Prop analysis results
         """
-        logger.info(f"Analyzing prop: {prop.player_name} {prop.stat_type} {prop.over_under} {prop.line}")
+        # Reject props we could never analyze before spending any API calls on them
+        player_name = (prop.player_name or "").strip()
+        if len(player_name) < 2:
+            return self._create_default_analysis(prop, "Missing player name")
+        stat_type = prop.stat_type.lower()
+        if stat_type not in STAT_TYPE_MAP:
+            return self._create_default_analysis(prop, f"Unsupported stat type '{prop.stat_type}'")
+        stat_key = STAT_TYPE_MAP[stat_type]
+        
+        # Lazy %-formatting: per-prop logging costs nothing unless DEBUG is on
+        logger.debug(
+            "Analyzing prop: %s %s %s %s",
+            prop.player_name, prop.stat_type, prop.over_under, prop.line
+        )
         
         # Get player info if needed
         if not prop.player_id:
@@ -83,33 +125,91 @@ class AnalysisEngine:
             # Cannot analyze without player data
             return self._create_default_analysis(prop, "Player not found in database")
         
-        # Fetch player stats
-        recent_games = await self.service.get_player_stats(prop.player_id, limit=10)
+        # Identical props on other slips reuse a recent analysis
+        cache_key = (
+            prop.player_id,
+            stat_key,
+            prop.line,
+            prop.over_under.lower(),
+            prop.game_date.date() if prop.game_date else None,
+            (prop.opponent_name or "").lower(),
+        )
+        now = time.time()
+        if cache_key in self._cache:
+            cached_analysis, cached_at = self._cache[cache_key]
+            if now - cached_at < self._cache_ttl:
+                return replace(
+                    cached_analysis,
+                    prop_id=prop.prop_id,
+                    player_name=prop.player_name,
+                    stat_type=prop.stat_type,
+                    over_under=prop.over_under,
+                    factors=dict(cached_analysis.factors)
+                )
+            del self._cache[cache_key]
+        
+        # Fetch player stats and the opponent lookup together (independent requests)
+        recent_games, opponent_rank = await asyncio.gather(
+            self.service.get_player_stats(prop.player_id, limit=10),
+            self._get_opponent_rank(prop.opponent_name)
+        )
         
         if not recent_games:
             return self._create_default_analysis(prop, "No recent game data available")
         
-        # Calculate hit rate
-        hit_rate = self._calculate_hit_rate(recent_games, prop)
+        # Number crunching runs off the event loop so other props' lookups keep flowing
+        analysis = await asyncio.to_thread(
+            self._compute_analysis, prop, stat_key, recent_games, opponent_rank
+        )
+        self._store_in_cache(cache_key, analysis, now)
+        return analysis
+    
+    def _store_in_cache(self, cache_key: Tuple, analysis: PropAnalysis, now: float) -> None:
+        """Cache an analysis, evicting expired and then oldest entries once the cache is full."""
+        # Re-inserting moves the key to the end, so dict order stays oldest-first
+        self._cache.pop(cache_key, None)
+        if len(self._cache) >= self.MAX_CACHE_ENTRIES:
+            expired = [k for k, (_, cached_at) in self._cache.items() if now - cached_at >= self._cache_ttl]
+            for k in expired:
+                del self._cache[k]
+            if len(self._cache) >= self.MAX_CACHE_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+        self._cache[cache_key] = (analysis, now)
+    
+    def _compute_analysis(
+        self,
+        prop: PropBetData,
+        stat_key: str,
+        recent_games: List[Dict],
+        opponent_rank: Optional[int]
+    ) -> PropAnalysis:
+        """
+        Build a prop's analysis from its fetched data (CPU only, no I/O).
         
-        # Calculate average stat
-        stat_key = self.STAT_TYPE_MAP.get(prop.stat_type.lower(), prop.stat_type.lower())
-        average_stat = self._calculate_average_stat(recent_games, stat_key)
+        Args:
+            prop: Prop bet data
+            stat_key: BallDontLie stat key for the prop
+            recent_games: Player's recent game stat rows, most recent first
+            opponent_rank: Opponent defensive rank, if known
+            
+        Returns:
+            Prop analysis results
+        """
+        stat_values, recent_count, minutes = self._extract_game_series(recent_games, stat_key)
         
-        # Get opponent data (simplified for now)
-        opponent_rank = None
-        if prop.opponent_name:
-            opponent_data = await self.service.search_team_by_name(prop.opponent_name)
-            if opponent_data:
-                # Simplified ranking - in production, fetch actual defensive rankings
-                opponent_rank = 15  # Middle of the pack default
+        # Hit rate, average and variance in one pass over the values
+        hit_rate, average_stat, variance = self._summarize_stats(
+            stat_values, prop.line, prop.over_under
+        )
         
         # Calculate pace adjustment (simplified)
         pace_adjustment = 1.0  # Default pace factor
         pace_adjusted_projection = average_stat * pace_adjustment
         
         # Analyze factors
-        factors = self._analyze_factors(recent_games, prop, stat_key)
+        factors = self._analyze_factors(
+            stat_values, recent_count, variance, minutes, len(recent_games)
+        )
         
         # Calculate confidence score
         confidence = self._calculate_confidence(hit_rate, factors, average_stat, prop.line)
@@ -136,57 +236,117 @@ class AnalysisEngine:
             analysis_notes=notes
         )
     
-    def _calculate_hit_rate(self, games: List[Dict], prop: PropBetData) -> float:
-        """Calculate how often the player hit this prop in recent games."""
-        stat_key = self.STAT_TYPE_MAP.get(prop.stat_type.lower(), prop.stat_type.lower())
-        
-        hits = 0
-        valid_games = 0
-        
-        for game in games:
-            stat_value = game.get(stat_key, 0)
-            if stat_value is not None:
-                valid_games += 1
-                if prop.over_under == 'over' and stat_value > prop.line:
-                    hits += 1
-                elif prop.over_under == 'under' and stat_value < prop.line:
-                    hits += 1
-        
-        return (hits / valid_games * 100) if valid_games > 0 else 0
+    async def _get_opponent_rank(self, opponent_name: Optional[str]) -> Optional[int]:
+        """Get the opponent's defensive rank (simplified for now)."""
+        if not opponent_name:
+            return None
+        opponent_data = await self.service.search_team_by_name(opponent_name)
+        if opponent_data:
+            # Simplified ranking - in production, fetch actual defensive rankings
+            return 15  # Middle of the pack default
+        return None
     
-    def _calculate_average_stat(self, games: List[Dict], stat_key: str) -> float:
-        """Calculate average stat value from recent games."""
-        values = []
-        for game in games:
-            value = game.get(stat_key, 0)
+    def _extract_game_series(
+        self, games: List[Dict], stat_key: str
+    ) -> Tuple[List[float], int, List[Optional[float]]]:
+        """
+        Walk the recent games once, collecting everything the calculations need.
+        
+        Args:
+            games: Recent game stat rows, most recent first
+            stat_key: BallDontLie stat key for the prop
+            
+        Returns:
+            Tuple of (recorded stat values, how many of them come from the 5 most
+            recent games, parsed minutes for each game with a minutes entry - None
+            where it could not be read)
+        """
+        stat_values = []
+        recent_count = 0
+        minutes = []
+        for index, game in enumerate(games):
+            value = game.get(stat_key)
             if value is not None:
-                values.append(value)
+                stat_values.append(value)
+                if index < RECENT_TREND_GAMES:
+                    recent_count += 1
+            played = game.get('min')
+            if played:
+                minutes.append(self._parse_minutes(played))
+        return stat_values, recent_count, minutes
+    
+    def _summarize_stats(
+        self, values: List[float], line: float, over_under: str
+    ) -> Tuple[float, float, Optional[float]]:
+        """
+        Hit rate, average and variance of the prop's stat in a single pass.
+        
+        Variance uses Welford's update, which is numerically stable without a
+        second pass over the values.
+        
+        Args:
+            values: Recorded stat values
+            line: Prop line
+            over_under: 'over' or 'under'
+            
+        Returns:
+            Tuple of (hit rate %, average, population variance - None if no values)
+        """
+        if not values:
+            return 0, 0, None
         
-        return np.mean(values) if values else 0
+        over = over_under == 'over'
+        under = over_under == 'under'
+        hits = 0
+        total = 0.0
+        mean = 0.0
+        m2 = 0.0
+        for count, value in enumerate(values, 1):
+            if (over and value > line) or (under and value < line):
+                hits += 1
+            total += value
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        
+        n = len(values)
+        return hits / n * 100, total / n, m2 / n
     
-    def _analyze_factors(self, games: List[Dict], prop: PropBetData, stat_key: str) -> Dict[str, float]:
+    def _analyze_factors(
+        self,
+        stat_values: List[float],
+        recent_count: int,
+        variance: Optional[float],
+        minutes: List[Optional[float]],
+        game_count: int
+    ) -> Dict[str, float]:
         """
         Analyze various factors affecting the prop.
         
+        Args:
+            stat_values: Recorded stat values, most recent first
+            recent_count: Number of stat_values from the 5 most recent games
+            variance: Population variance of stat_values (None if there are none)
+            minutes: Parsed minutes per game (None where unreadable)
+            game_count: Number of recent games fetched
+            
         Returns:
             Dictionary of factor names to impact scores (-1 to 1)
         """
         factors = {}
         
         # Recent trend
-        if len(games) >= 5:
-            recent_stats = [game.get(stat_key, 0) for game in games[:5] if game.get(stat_key) is not None]
+        if game_count >= RECENT_TREND_GAMES:
+            # Values recorded in the last 5 games (games without the stat are skipped)
+            recent_stats = stat_values[:recent_count]
             if recent_stats:
-                trend = np.polyfit(range(len(recent_stats)), recent_stats, 1)[0]
-                factors['recent_trend'] = float(np.clip(trend / 5, -1, 1))
+                trend = self._trend_slope(recent_stats)
+                factors['recent_trend'] = max(-1.0, min(trend / 5, 1.0))
         
         # Consistency
-        stats = [game.get(stat_key, 0) for game in games if game.get(stat_key) is not None]
-        if stats:
-            variance = np.var(stats)
+        if variance is not None:
             # Lower variance is better (more consistent)
-            consistency_score = 1 - min(variance / 50, 1)
-            factors['consistency'] = float(consistency_score)
+            factors['consistency'] = 1 - min(variance / 50, 1.0)
         
         # Home/Away (simplified - would need game details)
         factors['home_away'] = 0.0  # Neutral for now
@@ -195,27 +355,52 @@ class AnalysisEngine:
         factors['rest'] = 0.0  # Neutral for now
         
         # Minutes played trend
-        minutes = [game.get('min', '0:00') for game in games if game.get('min')]
         if minutes:
-            # Convert minutes to float (e.g., "34:25" -> 34.42)
-            try:
-                min_values = []
-                for m in minutes:
-                    if isinstance(m, str) and ':' in m:
-                        parts = m.split(':')
-                        min_values.append(int(parts[0]) + int(parts[1]) / 60)
-                    else:
-                        min_values.append(float(m) if m else 0)
-                
-                if min_values:
-                    avg_minutes = np.mean(min_values)
-                    # Playing time impact: 30+ minutes is good
-                    factors['playing_time'] = float(min(avg_minutes / 35, 1.0))
-            except:
+            min_values = [value for value in minutes if value is not None]
+            if min_values:
+                avg_minutes = sum(min_values) / len(min_values)
+                # Playing time impact: 30+ minutes is good
+                factors['playing_time'] = min(avg_minutes / 35, 1.0)
+            else:
                 factors['playing_time'] = 0.5  # Neutral if can't parse
         
         return factors
     
+    def _parse_minutes(self, minutes) -> Optional[float]:
+        """Parse a minutes value ("34:25", "34" or a number) to float minutes, or None if unreadable."""
+        if isinstance(minutes, str):
+            whole, sep, seconds = minutes.partition(':')
+            if sep:
+                if not (whole.isdigit() and seconds.isdigit()):
+                    return None
+                return int(whole) + int(seconds) / 60
+            try:
+                return float(minutes)
+            except ValueError:
+                return None
+        if isinstance(minutes, (int, float)):
+            return float(minutes)
+        return None
+    
+    def _trend_slope(self, values: List[float]) -> float:
+        """
+        Least-squares slope of values against their index (0..n-1).
+        
+        Closed form of np.polyfit(range(n), values, 1)[0]; the lists here are at most
+        a handful of games, where NumPy's per-call overhead dwarfs the arithmetic.
+        """
+        n = len(values)
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sum_x2 = (n - 1) * n * (2 * n - 1) / 6
+        sum_y = 0.0
+        sum_xy = 0.0
+        for x, y in enumerate(values):
+            sum_y += y
+            sum_xy += x * y
+        return (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+    
     def _calculate_confidence(self, hit_rate: float, factors: Dict[str, float], 
                             avg_stat: float, line: float) -> float:
         """
@@ -242,34 +427,17 @@ class AnalysisEngine:
             distance_boost = -min(distance_from_line * 2, 10)
         
         # Factor adjustments
-        factor_weights = {
-            'recent_trend': 8,
-            'consistency': 10,
-            'home_away': 5,
-            'rest': 3,
-            'playing_time': 8
-        }
-        
         factor_adjustment = sum(
             factors.get(k, 0) * v 
-            for k, v in factor_weights.items()
+            for k, v in FACTOR_WEIGHTS
         )
         
         confidence = base_confidence + distance_boost + factor_adjustment
-        return float(np.clip(confidence, 0, 100))
+        return max(0.0, min(confidence, 100.0))
     
     def _generate_recommendation(self, confidence: float, over_under: str) -> str:
         """Generate actionable recommendation based on confidence."""
-        if confidence >= 70:
-            return 'strong_bet'
-        elif confidence >= 58:
-            return 'bet'
-        elif confidence >= 45:
-            return 'neutral'
-        elif confidence >= 30:
-            return 'avoid'
-        else:
-            return 'strong_avoid'
+        return RECOMMENDATION_LABELS[bisect.bisect_right(RECOMMENDATION_THRESHOLDS, confidence)]
     
     def _generate_analysis_notes(self, prop: PropBetData, hit_rate: float, 
                                 average_stat: float, factors: Dict[str, float]) -> str:
@@ -335,15 +503,35 @@ class AnalysisEngine:
         Returns:
             Dictionary containing overall analysis and individual prop analyses
         """
-        # Analyze each prop
-        prop_analyses = []
-        for prop in props:
-            analysis = await self.analyze_prop(prop)
-            prop_analyses.append(analysis)
+        # Analyze props concurrently so their stat lookups overlap
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_PROPS)
+        
+        async def analyze_bounded(prop: PropBetData) -> PropAnalysis:
+            async with semaphore:
+                return await self.analyze_prop(prop)
+        
+        results = await asyncio.gather(*(analyze_bounded(p) for p in props), return_exceptions=True)
         
+        # One failed lookup should not sink the whole slip
+        prop_analyses = []
+        for prop, result in zip(props, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    # Cancellation is not an analysis failure; let it propagate
+                    raise result
+                logger.error(f"Error analyzing prop {prop.prop_id} ({prop.player_name}): {result}")
+                result = self._create_default_analysis(prop, "Analysis error")
+            prop_analyses.append(result)
+        
+        result = self._aggregate_results(prop_analyses)
+        logger.info("Analyzed %d props, overall confidence %s", len(props), result['overall_confidence'])
+        return result
+    
+    def _aggregate_results(self, prop_analyses: List[PropAnalysis]) -> Dict:
+        """Combine individual prop analyses into the overall slip analysis."""
         # Calculate overall confidence (average of all props)
         confidences = [a.confidence_score for a in prop_analyses]
-        overall_confidence = np.mean(confidences) if confidences else 50.0
+        overall_confidence = sum(confidences) / len(confidences) if confidences else 50.0
         
         # Identify recommended bets (confidence >= 58)
         recommended = [a.prop_id for a in prop_analyses if a.confidence_score >= 58]
@@ -357,16 +545,16 @@ class AnalysisEngine:
             risk = "high"
         
         # Generate parlay suggestions (top 2-3 props)
-        top_props = sorted(prop_analyses, key=lambda x: x.confidence_score, reverse=True)[:3]
+        top_props = heapq.nlargest(3, prop_analyses, key=attrgetter('confidence_score'))
         parlay_suggestions = [
             {
                 "props": [p.prop_id for p in top_props[:2]],
-                "confidence": np.mean([p.confidence_score for p in top_props[:2]]),
+                "confidence": sum(p.confidence_score for p in top_props[:2]) / 2,
                 "description": "Top 2 props parlay"
             },
             {
                 "props": [p.prop_id for p in top_props],
-                "confidence": np.mean([p.confidence_score for p in top_props]),
+                "confidence": sum(p.confidence_score for p in top_props) / len(top_props),
                 "description": "Top 3 props parlay"
             }
         ] if len(top_props) >= 2 else []
@@ -378,6 +566,10 @@ class AnalysisEngine:
             "parlay_suggestions": parlay_suggestions,
             "prop_analyses": prop_analyses
         }
+    
+    def clear_cache(self):
+        """Clear cached prop analyses."""
+        self._cache.clear()
 
 
 # Global instance
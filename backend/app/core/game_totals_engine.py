@@ -5,10 +5,19 @@ Provides comprehensive game total projections using a multi-factor weighted mode
 with heavy emphasis on PACE, shooting efficiency, and star player utilization.
 Integrates data from both nba_api (live) and BallDontLie (historical/season).
 """
+import asyncio
+import bisect
+import heapq
 import logging
+import re
+import time
 from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter, itemgetter, mul
 from typing import List, Dict, Optional, Any, Tuple
 
+from pydantic import TypeAdapter
+
 logger = logging.getLogger(__name__)
 
 # ============================================================
@@ -32,6 +41,17 @@ MODERATE_LEAD_THRESHOLD = 15
 FOUL_TROUBLE_THRESHOLD = 3
 SHOOTING_REGRESSION_RATE = 0.40  # Regress 40% back to mean
 
+# eFG% deviation cutoffs (ascending); a deviation above each cutoff moves up one label
+SHOOTING_VARIANCE_THRESHOLDS = (-8, -3, 3, 8)
+SHOOTING_VARIANCE_LABELS = ('extreme_cold', 'cold', 'normal', 'hot', 'extreme_hot')
+# Per-team adjustments keyed by shooting variance level
+SHOOTING_VARIANCE_UNCERTAINTY = {
+    'extreme_hot': 0.15, 'hot': 0.08, 'normal': 0.0, 'cold': 0.08, 'extreme_cold': 0.15,
+}
+SHOOTING_VARIANCE_CONFIDENCE = {
+    'extreme_hot': -6, 'hot': 0, 'normal': 5, 'cold': 0, 'extreme_cold': -6,
+}
+
 # Projection weights - heavy on PACE, shooting, stars per user request
 TOTALS_WEIGHTS = {
     'pace_component': 0.30,
@@ -41,12 +61,50 @@ TOTALS_WEIGHTS = {
     'team_ratings': 0.10,
     'regression': 0.05,
 }
+# Weight vector in TOTALS_WEIGHTS order, matched against the component tuple in analyze()
+TOTALS_WEIGHT_VECTOR = tuple(TOTALS_WEIGHTS.values())
+MODEL_FACTORS = {k: round(v, 3) for k, v in TOTALS_WEIGHTS.items()}
+
+# Season averages barely move within a night; failed lookups are retried sooner
+SEASON_STATS_CACHE_TTL = 3600   # seconds
+SEASON_STATS_MISS_TTL = 60      # seconds
+SEASON_STATS_CACHE_MAX = 2048   # players; the oldest entry is evicted beyond this
+
+# Spread blend: live margin vs season net-rating margin, plus star performance differential
+SPREAD_LIVE_WEIGHT = 0.60        # Half a game of live data
+SPREAD_SEASON_WEIGHT = 0.40
+SPREAD_STAR_WEIGHT = 0.3
+
+# Game clock: nba_api live ISO duration ("PT05M23.40S"), "MM:SS", or bare seconds
+CLOCK_RE = re.compile(r"PT(?:(\d+)M)?([\d.]+)S|(\d+):([\d.]+)|([\d.]+)")
+
+
+def _clamp(value, low, high):
+    """Clamp value to [low, high]; same result as max(low, min(high, value))."""
+    return low if value <= low else high if value >= high else value
+
+
+@lru_cache(maxsize=256)
+def _remaining_in_quarter(clock: str) -> float:
+    """Minutes left in the current quarter from a game clock string (12.0 if unreadable)."""
+    match = CLOCK_RE.fullmatch(clock)
+    if not match:
+        return 12.0
+    iso_mins, iso_secs, mins, secs, bare_secs = match.groups()
+    try:
+        if mins is not None:
+            return float(mins) + float(secs) / 60.0
+        if bare_secs is not None:
+            return float(bare_secs) / 60.0
+        return float(iso_mins or 0) + float(iso_secs) / 60.0
+    except ValueError:
+        return 12.0
 
 
 # ============================================================
 # Data Structures
 # ============================================================
-@dataclass
+@dataclass(slots=True)
 class PaceAnalysis:
     """Detailed pace breakdown for the game."""
     first_half_possessions_est: float
@@ -63,7 +121,7 @@ class PaceAnalysis:
     transition_rate: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamShootingProfile:
     """Team-level shooting efficiency for one team."""
     team_abbr: str
@@ -85,7 +143,7 @@ class TeamShootingProfile:
     shooting_variance_level: str        # extreme_hot, hot, normal, cold, extreme_cold
 
 
-@dataclass
+@dataclass(slots=True)
 class StarPlayerImpact:
     """Star player's impact on team total."""
     player_name: str
@@ -105,7 +163,7 @@ class StarPlayerImpact:
     impact_on_team_total: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamQuarterProjection:
     """Per-team, per-quarter score projection."""
     team_abbr: str
@@ -117,7 +175,7 @@ class TeamQuarterProjection:
     projected_final_score: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class SpreadPrediction:
     """Point spread analysis and prediction."""
     current_spread: int
@@ -130,7 +188,7 @@ class SpreadPrediction:
     blowout_probability: float = 10.0
 
 
-@dataclass
+@dataclass(slots=True)
 class OverUnderRecommendation:
     """Over/under recommendation with edge calculation."""
     projected_total: float
@@ -143,7 +201,7 @@ class OverUnderRecommendation:
     confidence: float = 50.0
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedGameTotalProjection:
     """Complete enhanced game totals projection."""
     game_id: str
@@ -178,6 +236,32 @@ class EnhancedGameTotalProjection:
     model_factors: Dict[str, float] = field(default_factory=dict)
     analysis_notes: List[str] = field(default_factory=list)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict of the projection (serialized by pydantic-core, no asdict deep copy)."""
+        return _projection_adapter.dump_python(self, mode='json', warnings=False)
+
+
+# Built once at import; reused for every projection
+_projection_adapter = TypeAdapter(EnhancedGameTotalProjection)
+
+# Process-wide season stats, shared by every engine instance: player_id -> (stats, fetched_at)
+_season_stats_cache: Dict[int, Tuple[Optional[Dict], float]] = {}
+# Lookups currently in flight, so concurrent analyses share one fetch per player
+_season_stats_pending: Dict[int, asyncio.Future] = {}
+
+
+def _cached_season_stats(player_id: int) -> Tuple[bool, Optional[Dict]]:
+    """Return (hit, stats) for a player, dropping the entry once it has expired."""
+    entry = _season_stats_cache.get(player_id)
+    if entry is None:
+        return False, None
+    stats, fetched_at = entry
+    ttl = SEASON_STATS_CACHE_TTL if stats is not None else SEASON_STATS_MISS_TTL
+    if time.time() - fetched_at < ttl:
+        return True, stats
+    del _season_stats_cache[player_id]
+    return False, None
+
 
 # ============================================================
 # Engine
@@ -194,13 +278,34 @@ class GameTotalsEngine:
         self.live_client = live_client
         self.bdl_service = bdl_service
         self.bdl_analytics = bdl_analytics
-        self._season_stats_cache: Dict[int, Optional[Dict]] = {}
 
     async def _get_player_season_stats(self, player_id: int, player_name: str) -> Optional[Dict]:
-        """Get player season stats using nba_api with BDL fallback (cached per analysis run)."""
-        if player_id in self._season_stats_cache:
-            return self._season_stats_cache[player_id]
-
+        """Get player season stats using nba_api with BDL fallback (cached across analyses)."""
+        hit, stats = _cached_season_stats(player_id)
+        if hit:
+            return stats
+
+        pending = _season_stats_pending.get(player_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_player_season_stats(player_id, player_name))
+            _season_stats_pending[player_id] = pending
+        # Shielded so one cancelled analysis doesn't cancel the fetch for the others
+        return await asyncio.shield(pending)
+
+    async def _fetch_player_season_stats(self, player_id: int, player_name: str) -> Optional[Dict]:
+        """Fetch season stats behind a cache miss and store the result."""
+        try:
+            stats = await self._load_player_season_stats(player_id, player_name)
+            if len(_season_stats_cache) >= SEASON_STATS_CACHE_MAX:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                del _season_stats_cache[next(iter(_season_stats_cache))]
+            _season_stats_cache[player_id] = (stats, time.time())
+            return stats
+        finally:
+            del _season_stats_pending[player_id]
+
+    async def _load_player_season_stats(self, player_id: int, player_name: str) -> Optional[Dict]:
+        """Load season stats from nba_api, falling back to BallDontLie."""
         stats = None
         # Try nba_api first
         try:
@@ -232,9 +337,20 @@ class GameTotalsEngine:
             except Exception as e:
                 logger.debug(f"BDL season stats also failed for {player_name}: {e}")
 
-        self._season_stats_cache[player_id] = stats
         return stats
 
+    async def _prefetch_season_stats(self, players) -> None:
+        """Fetch season stats for all uncached players concurrently (fills the cache)."""
+        pending = {}
+        for p in players:
+            if p.player_id not in pending and not _cached_season_stats(p.player_id)[0]:
+                pending[p.player_id] = p.player_name
+        if pending:
+            await asyncio.gather(
+                *(self._get_player_season_stats(pid, name) for pid, name in pending.items()),
+                return_exceptions=True
+            )
+
     # ----------------------------------------------------------
     # Helpers
     # ----------------------------------------------------------
@@ -249,18 +365,7 @@ class GameTotalsEngine:
         elapsed = completed_quarters * 12.0
 
         # Parse remaining clock in current quarter
-        remaining_in_q = 12.0
-        try:
-            if ":" in clock:
-                parts = clock.replace("PT", "").replace("S", "").split(":")
-                if len(parts) == 2:
-                    mins = float(parts[0].replace("M", ""))
-                    secs = float(parts[1])
-                    remaining_in_q = mins + secs / 60.0
-            elif clock:
-                remaining_in_q = float(clock.replace("PT", "").replace("M", "").replace("S", "")) / 60.0
-        except (ValueError, IndexError):
-            pass
+        remaining_in_q = _remaining_in_quarter(clock) if clock else 12.0
 
         elapsed += (12.0 - remaining_in_q)
         return max(elapsed, 1.0)
@@ -288,7 +393,7 @@ class GameTotalsEngine:
         elapsed_min = self._elapsed_minutes(game_data)
         total_game_min = 48.0
         remaining_min = max(total_game_min - elapsed_min, 0.0)
-        elapsed_fraction = elapsed_min / total_game_min
+        remaining_fraction = remaining_min / total_game_min
 
         # 1. Pace Analysis (weight: 0.30)
         pace = self._analyze_pace(
@@ -296,17 +401,18 @@ class GameTotalsEngine:
             home_ratings, away_ratings, elapsed_min
         )
 
-        # 2. Shooting Profiles (weight: 0.25)
-        home_shooting = await self._analyze_team_shooting(
-            game_data.home_team_abbr, home_players, home_agg
-        )
-        away_shooting = await self._analyze_team_shooting(
-            game_data.away_team_abbr, away_players, away_agg
-        )
-
-        # 3. Star Player Analysis (weight: 0.20)
-        stars = await self._analyze_star_players(
-            home_players, away_players, game_data, home_agg, away_agg, remaining_min
+        # 2. Shooting Profiles (weight: 0.25) and 3. Star Player Analysis (weight: 0.20)
+        # are independent and bound by season-stats fetches, so run them together
+        home_shooting, away_shooting, stars = await asyncio.gather(
+            self._analyze_team_shooting(
+                game_data.home_team_abbr, home_players, home_agg
+            ),
+            self._analyze_team_shooting(
+                game_data.away_team_abbr, away_players, away_agg
+            ),
+            self._analyze_star_players(
+                home_players, away_players, game_data, home_agg, away_agg, remaining_min
+            ),
         )
 
         # 4. Game flow assessment
@@ -339,7 +445,7 @@ class GameTotalsEngine:
 
         # -- Team ratings component
         ratings_projected_remaining = self._team_ratings_projection(
-            home_ratings, away_ratings, current_total, remaining_min
+            home_ratings, away_ratings, current_total, remaining_fraction
         )
 
         # -- Regression component (mean reversion to league average)
@@ -349,17 +455,18 @@ class GameTotalsEngine:
             avg_off_rtg = (home_ratings.off_rating + away_ratings.off_rating) / 2
             season_avg_total = expected_pace * (avg_off_rtg / 100) * 2
         # Remaining portion of season average
-        regression_projected_remaining = season_avg_total * (remaining_min / total_game_min)
+        regression_projected_remaining = season_avg_total * remaining_fraction
 
         # Weighted combination
-        projected_remaining = (
-            TOTALS_WEIGHTS['pace_component'] * pace_projected_remaining +
-            TOTALS_WEIGHTS['shooting_component'] * shooting_projected_remaining +
-            TOTALS_WEIGHTS['star_utilization'] * star_projected_remaining +
-            TOTALS_WEIGHTS['game_flow'] * game_flow_projected_remaining +
-            TOTALS_WEIGHTS['team_ratings'] * ratings_projected_remaining +
-            TOTALS_WEIGHTS['regression'] * regression_projected_remaining
+        components = (
+            pace_projected_remaining,
+            shooting_projected_remaining,
+            star_projected_remaining,
+            game_flow_projected_remaining,
+            ratings_projected_remaining,
+            regression_projected_remaining,
         )
+        projected_remaining = sum(map(mul, TOTALS_WEIGHT_VECTOR, components))
 
         projected_final = current_total + projected_remaining
 
@@ -420,7 +527,7 @@ class GameTotalsEngine:
             over_under=over_under,
             total_confidence=round(total_confidence, 1),
             blowout_risk=blowout_risk,
-            model_factors={k: round(v, 3) for k, v in TOTALS_WEIGHTS.items()},
+            model_factors=dict(MODEL_FACTORS),
             analysis_notes=notes,
         )
 
@@ -544,13 +651,14 @@ class GameTotalsEngine:
 
         # Fetch season baselines from nba_api for top minutes players
         try:
-            top_players = sorted(players, key=lambda p: p.minutes_float, reverse=True)[:5]
+            top_players = heapq.nlargest(5, players, key=attrgetter('minutes_float'))
             total_mins = sum(p.minutes_float for p in top_players)
             weighted_fg = 0
             weighted_fg3 = 0
             weighted_ft = 0
             got_data = False
 
+            await self._prefetch_season_stats(top_players)
             for p in top_players:
                 stats = await self._get_player_season_stats(p.player_id, p.player_name)
                 if stats and total_mins > 0:
@@ -578,16 +686,7 @@ class GameTotalsEngine:
             regression_factor = 1.0 - (efg_deviation * SHOOTING_REGRESSION_RATE / 100)
 
         # Variance classification
-        if efg_deviation > 8:
-            variance_level = "extreme_hot"
-        elif efg_deviation > 3:
-            variance_level = "hot"
-        elif efg_deviation > -3:
-            variance_level = "normal"
-        elif efg_deviation > -8:
-            variance_level = "cold"
-        else:
-            variance_level = "extreme_cold"
+        variance_level = SHOOTING_VARIANCE_LABELS[bisect.bisect_left(SHOOTING_VARIANCE_THRESHOLDS, efg_deviation)]
 
         return TeamShootingProfile(
             team_abbr=team_abbr,
@@ -634,6 +733,8 @@ class GameTotalsEngine:
         """Identify and analyze top players' impact on team totals."""
         stars = []
 
+        # Pick each team's stars first so their season stats can be fetched together
+        team_stars = []
         for team_label, players, team_agg in [
             (game_data.home_team_abbr, home_players, home_agg),
             (game_data.away_team_abbr, away_players, away_agg),
@@ -652,9 +753,11 @@ class GameTotalsEngine:
                 player_usage.append((p, usage))
 
             # Top 3 by usage
-            player_usage.sort(key=lambda x: x[1], reverse=True)
-            top_stars = player_usage[:3]
+            team_stars.append((team_label, heapq.nlargest(3, player_usage, key=itemgetter(1))))
 
+        await self._prefetch_season_stats(p for _, top_stars in team_stars for p, _ in top_stars)
+
+        for team_label, top_stars in team_stars:
             for p, usage_rate in top_stars:
                 # Shooting efficiency (TS%)
                 ts_pct = 0.0
@@ -787,13 +890,12 @@ class GameTotalsEngine:
     # Team Ratings Projection
     # ----------------------------------------------------------
     def _team_ratings_projection(self, home_ratings, away_ratings, current_total,
-                                 remaining_min: float = 24.0):
+                                 remaining_fraction: float = 0.5):
         """Project remaining points from team offensive/defensive ratings."""
         if not home_ratings or not away_ratings:
-            return current_total * (remaining_min / 48.0) * 0.95
+            return current_total * remaining_fraction * 0.95
 
         avg_pace = (home_ratings.pace + away_ratings.pace) / 2
-        remaining_fraction = remaining_min / 48.0
 
         home_expected_pts = (avg_pace * home_ratings.off_rating / 100) * remaining_fraction
         away_expected_pts = (avg_pace * away_ratings.off_rating / 100) * remaining_fraction
@@ -864,7 +966,7 @@ class GameTotalsEngine:
         home_proj_final = game_data.home_score + home_q3 + home_q4
         away_proj_final = game_data.away_score + away_q3 + away_q4
         proj_margin = abs(home_proj_final - away_proj_final)
-        ot_prob = max(0, min(25, 15 - proj_margin * 2))
+        ot_prob = _clamp(15 - proj_margin * 2, 0, 25)
 
         home_quarter = TeamQuarterProjection(
             team_abbr=game_data.home_team_abbr,
@@ -905,32 +1007,29 @@ class GameTotalsEngine:
             rating_spread = 0
 
         # Blend live performance with season expectations
-        # Weight live at 60% since we have half a game of data
-        projected_spread = current_spread * 0.60 + rating_spread * 0.40
-
-        # Star performance differential
-        home_star_impact = sum(
-            s.impact_on_team_total for s in stars
-            if s.team_abbr == game_data.home_team_abbr
-        )
-        away_star_impact = sum(
-            s.impact_on_team_total for s in stars
-            if s.team_abbr == game_data.away_team_abbr
-        )
+        projected_spread = current_spread * SPREAD_LIVE_WEIGHT + rating_spread * SPREAD_SEASON_WEIGHT
+
+        # Star performance differential (one pass over both teams' stars)
+        home_abbr = game_data.home_team_abbr
+        away_abbr = game_data.away_team_abbr
+        home_star_impact = away_star_impact = 0.0
+        for s in stars:
+            if s.team_abbr == home_abbr:
+                home_star_impact += s.impact_on_team_total
+            elif s.team_abbr == away_abbr:
+                away_star_impact += s.impact_on_team_total
         star_diff = home_star_impact - away_star_impact
-        projected_spread += star_diff * 0.3
+        projected_spread += star_diff * SPREAD_STAR_WEIGHT
 
-        # Momentum from pace
+        # Momentum from pace: an accelerating game favours whoever leads by more than 5
         momentum = "neutral"
-        if current_spread > 5 and pace.pace_trend == "accelerating":
+        if pace.pace_trend == "accelerating" and abs(current_spread) > 5:
             momentum = "home" if home_lead else "away"
-        elif current_spread < -5 and pace.pace_trend == "accelerating":
-            momentum = "away" if not home_lead else "home"
 
         # Probabilities
         abs_proj = abs(projected_spread)
-        close_game_prob = max(5, min(60, 45 - abs_proj * 3))
-        blowout_prob = max(2, min(50, abs_proj * 2.5 - 10))
+        close_game_prob = _clamp(45 - abs_proj * 3, 5, 60)
+        blowout_prob = _clamp(abs_proj * 2.5 - 10, 2, 50)
 
         # Confidence in spread prediction
         spread_conf = 50.0
@@ -938,7 +1037,7 @@ class GameTotalsEngine:
             spread_conf += 15  # Large leads more predictable
         if home_ratings and away_ratings:
             spread_conf += 10  # Have season data
-        spread_conf = max(20, min(85, spread_conf))
+        spread_conf = _clamp(spread_conf, 20, 85)
 
         return SpreadPrediction(
             current_spread=current_spread,
@@ -962,12 +1061,11 @@ class GameTotalsEngine:
         pace_mult = 1.0 + abs(pace.pace_deviation) * 0.02
 
         # Extreme shooting = more uncertainty (regression unpredictable)
-        shooting_mult = 1.0
-        for s in [home_s, away_s]:
-            if s.shooting_variance_level in ("extreme_hot", "extreme_cold"):
-                shooting_mult += 0.15
-            elif s.shooting_variance_level in ("hot", "cold"):
-                shooting_mult += 0.08
+        shooting_mult = (
+            1.0
+            + SHOOTING_VARIANCE_UNCERTAINTY[home_s.shooting_variance_level]
+            + SHOOTING_VARIANCE_UNCERTAINTY[away_s.shooting_variance_level]
+        )
 
         # High 3pt rate = more variance
         avg_fg3_rate = (home_s.live_fg3_rate + away_s.live_fg3_rate) / 2
@@ -995,9 +1093,10 @@ class GameTotalsEngine:
         if abs(pace.pace_deviation) < 5:
             confidence += 10  # Predictable pace
         # Normal shooting (less regression risk)
-        for s in [home_s, away_s]:
-            if s.shooting_variance_level == "normal":
-                confidence += 5
+        if home_s.shooting_variance_level == "normal":
+            confidence += 5
+        if away_s.shooting_variance_level == "normal":
+            confidence += 5
 
         # Edge magnitude boosts confidence
         if abs(edge) > 4:
@@ -1005,7 +1104,7 @@ class GameTotalsEngine:
         elif abs(edge) > 2:
             confidence += 5
 
-        confidence = max(20, min(90, confidence))
+        confidence = _clamp(confidence, 20, 90)
 
         # Recommendation
         if edge > 4 and confidence >= 65:
@@ -1047,12 +1146,9 @@ class GameTotalsEngine:
         else:
             confidence -= 8
 
-        # Normal shooting is more predictable
-        for s in [home_s, away_s]:
-            if s.shooting_variance_level == "normal":
-                confidence += 5
-            elif s.shooting_variance_level in ("extreme_hot", "extreme_cold"):
-                confidence -= 6
+        # Normal shooting is more predictable; extreme shooting less so
+        confidence += SHOOTING_VARIANCE_CONFIDENCE[home_s.shooting_variance_level]
+        confidence += SHOOTING_VARIANCE_CONFIDENCE[away_s.shooting_variance_level]
 
         # Star player health
         foul_trouble_count = sum(1 for s in stars if s.foul_trouble)
@@ -1067,7 +1163,7 @@ class GameTotalsEngine:
         if is_close:
             confidence -= 3
 
-        return max(15, min(95, confidence))
+        return _clamp(confidence, 15, 95)
 
     # ----------------------------------------------------------
     # Notes Generation
@@ -1110,12 +1206,18 @@ class GameTotalsEngine:
                 )
 
         # Star notes
-        hot_stars = [s for s in stars if s.hot_cold_indicator == "hot"]
+        hot_stars = []
+        foul_stars = []
+        for s in stars:
+            if s.hot_cold_indicator == "hot":
+                hot_stars.append(s)
+            if s.foul_trouble:
+                foul_stars.append(s)
+
         if hot_stars:
             names = ", ".join(s.player_name for s in hot_stars[:2])
             notes.append(f"Star(s) running hot: {names}. Factor in regression.")
 
-        foul_stars = [s for s in stars if s.foul_trouble]
         if foul_stars:
             names = ", ".join(f"{s.player_name} ({s.foul_count}F)" for s in foul_stars)
             notes.append(f"Foul trouble: {names}. Minutes may be limited in 2H.")
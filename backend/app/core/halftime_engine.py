@@ -14,8 +14,9 @@ Enhanced with:
 import logging
 from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
+import time
 
 from app.services.live_data_client import (
     LiveDataClient, LiveGameData, LivePlayerStats, live_data_client
@@ -28,6 +29,8 @@ logger = logging.getLogger(__name__)
 # Configuration constants
 BLOWOUT_THRESHOLD = getattr(settings, 'BLOWOUT_THRESHOLD', 20)
 FOUL_TROUBLE_THRESHOLD = getattr(settings, 'FOUL_TROUBLE_THRESHOLD', 3)
+ANALYSIS_CACHE_TTL = 30  # seconds; the game clock is stopped at halftime
+ANALYSIS_CACHE_MAX = 64  # games; the oldest entry is evicted beyond this
 LEAGUE_AVG_PACE = 100.0  # League average possessions per 48 min
 LEAGUE_AVG_TOTAL = 225.0  # League average combined score
 LEAGUE_AVG_OFF_RTG = 114.0  # League average offensive rating
@@ -194,6 +197,9 @@ class HalftimeAnalysisEngine:
         self.live_client = live_client or live_data_client
         self.bdl_analytics = bdl_analytics
         self._team_ratings_cache: Dict[int, TeamRatings] = {}
+        # Short-lived full analyses keyed by game_id; absorbs bursts of duplicate requests
+        self._analysis_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._analysis_cache_ttl = ANALYSIS_CACHE_TTL
 
     def _get_stat_value(self, stats: LivePlayerStats, prop_type: str) -> float:
         """Extract the relevant stat value based on prop type."""
@@ -1137,9 +1143,33 @@ class HalftimeAnalysisEngine:
         """
         Get complete halftime analysis for a game.
         Enhanced with team ratings and opponent defensive analysis.
+
+        Results without custom prop lines are cached per game for a short TTL.
         """
-        games = await self.live_client.get_todays_games()
-        game_data = next((g for g in games if g.game_id == game_id), None)
+        if prop_lines is not None:
+            return await self._build_halftime_analysis(game_id, prop_lines)
+
+        now = time.time()
+        if game_id in self._analysis_cache:
+            cached_analysis, cached_at = self._analysis_cache[game_id]
+            if now - cached_at < self._analysis_cache_ttl:
+                return cached_analysis
+
+        analysis = await self._build_halftime_analysis(game_id)
+        self._analysis_cache.pop(game_id, None)
+        if len(self._analysis_cache) >= ANALYSIS_CACHE_MAX:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del self._analysis_cache[next(iter(self._analysis_cache))]
+        self._analysis_cache[game_id] = (analysis, now)
+        return analysis
+
+    async def _build_halftime_analysis(
+        self,
+        game_id: str,
+        prop_lines: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> Dict[str, Any]:
+        """Run the full halftime analysis for a game (uncached)."""
+        game_data = await self.live_client.get_game_by_id(game_id)
 
         if not game_data:
             raise ValueError(f"Game {game_id} not found")
@@ -1264,7 +1294,6 @@ class HalftimeAnalysisEngine:
         try:
             from app.core.game_totals_engine import GameTotalsEngine
             from app.services.balldontlie import balldontlie_service
-            from dataclasses import asdict
             totals_engine = GameTotalsEngine(
                 live_client=self.live_client,
                 bdl_service=balldontlie_service,
@@ -1273,31 +1302,13 @@ class HalftimeAnalysisEngine:
             enhanced_result = await totals_engine.analyze(
                 game_data, box_score, home_ratings, away_ratings
             )
-            enhanced_game_totals = asdict(enhanced_result)
+            enhanced_game_totals = enhanced_result.to_dict()
         except Exception as e:
             logger.warning(f"Enhanced game totals analysis failed: {e}")
 
         return {
             'game_id': game_id,
-            'game_info': {
-                'game_id': game_data.game_id,
-                'game_status': game_data.game_status,
-                'game_status_text': game_data.game_status_text,
-                'period': game_data.period,
-                'game_clock': game_data.game_clock,
-                'home_team_id': game_data.home_team_id,
-                'home_team_name': game_data.home_team_name,
-                'home_team_abbr': game_data.home_team_abbr,
-                'home_score': game_data.home_score,
-                'away_team_id': game_data.away_team_id,
-                'away_team_name': game_data.away_team_name,
-                'away_team_abbr': game_data.away_team_abbr,
-                'away_score': game_data.away_score,
-                'game_date': game_data.game_date,
-                'is_halftime': game_data.is_halftime,
-                'score_differential': game_data.score_differential,
-                'total_score': game_data.total_score,
-            },
+            'game_info': game_data.to_dict(),
             'team_ratings': {
                 'home': {
                     'off_rating': home_ratings.off_rating,
@@ -1374,7 +1385,7 @@ class HalftimeAnalysisEngine:
                 for a in player_analyses
             ],
             'suggestions': suggestions,
-            'analysis_timestamp': datetime.utcnow().isoformat(),
+            'analysis_timestamp': datetime.now(timezone.utc).isoformat(),
             'warnings': warnings,
             'enhanced_game_totals': enhanced_game_totals,
         }
@@ -1,18 +1,23 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 
+GUEST_USER_ID = 1
 
-def get_current_user(
-    db: Session = Depends(get_db)
+# Set once the guest row is known to exist, so later requests skip the lookup
+_guest_user_ready = False
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Return the default guest user, creating it if needed."""
-    user = db.query(User).filter(User.id == 1).first()
+    user = await db.get(User, GUEST_USER_ID)
     if not user:
         user = User(
-            id=1,
+            id=GUEST_USER_ID,
             email="guest@propbet.local",
             username="guest",
             hashed_password="none",
@@ -20,6 +25,17 @@ def get_current_user(
             is_active=True,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     return user
+
+
+async def get_current_user_id(
+    db: AsyncSession = Depends(get_async_db)
+) -> int:
+    """Return the current user's id without loading the user row."""
+    global _guest_user_ready
+    if not _guest_user_ready:
+        await get_current_user(db)
+        _guest_user_ready = True
+    return GUEST_USER_ID
@@ -1,10 +1,14 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 
-from app.config import settings
+from app.config import Settings, get_settings, settings
 from app.api import auth, bets, halftime
 from app.database import engine, Base
+from app.services.balldontlie import balldontlie_service
+from app.services.live_data_client import live_data_client
 from app.models.user import User
 from app.models.bet import BetSlip, PropBet, Analysis
 from app.models.live_analysis import LiveAnalysisSnapshot, LivePropSuggestion
@@ -22,6 +26,7 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     description="NBA Prop Bet Analysis API - Analyze prop bets with AI-powered insights",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -46,22 +51,40 @@ def on_startup():
     logger.info("Database tables created/verified")
 
 
+@app.on_event("startup")
+async def start_scoreboard_refresh():
+    """Keep one shared scoreboard fresh so game-list polls never hit nba_api directly."""
+    app.state.scoreboard_task = asyncio.create_task(live_data_client.refresh_scoreboard_loop())
+
+
+@app.on_event("shutdown")
+async def stop_scoreboard_refresh():
+    """Cancel the background scoreboard refresh."""
+    app.state.scoreboard_task.cancel()
+
+
+@app.on_event("shutdown")
+async def close_balldontlie_client():
+    """Close the pooled BallDontLie HTTP client."""
+    await balldontlie_service.close()
+
+
 @app.get("/")
-def root():
+def root(app_settings: Settings = Depends(get_settings)):
     """Root endpoint."""
     return {
         "message": "PropBet Analyzer API",
-        "version": settings.VERSION,
+        "version": app_settings.VERSION,
         "status": "running"
     }
 
 
 @app.get("/health")
-def health_check():
+def health_check(app_settings: Settings = Depends(get_settings)):
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "environment": settings.ENVIRONMENT
+        "environment": app_settings.ENVIRONMENT
     }
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, JSON, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,13 +8,15 @@ class BetSlip(Base):
     """Bet slip submitted by user for analysis."""
     
     __tablename__ = "bet_slips"
+    # Fetch server defaults (created_at) during the INSERT rather than lazily afterwards
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=True)  # User can name their bet slip
     slip_type = Column(String, default="manual")  # manual, ocr, etc.
     image_url = Column(String, nullable=True)  # If uploaded image
-    status = Column(String, default="pending")  # pending, analyzed, failed
+    status = Column(String, default="pending")  # ocr_pending, ocr_failed, pending, analyzed, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     analyzed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -22,6 +24,11 @@ class BetSlip(Base):
     user = relationship("User", back_populates="bet_slips")
     prop_bets = relationship("PropBet", back_populates="bet_slip", cascade="all, delete-orphan")
     analysis = relationship("Analysis", back_populates="bet_slip", uselist=False, cascade="all, delete-orphan")
+    
+    # Serves the per-user, newest-first listing without a sort
+    __table_args__ = (
+        Index("ix_bet_slips_user_id_created_at", "user_id", created_at.desc()),
+    )
 
 
 class PropBet(Base):
@@ -2,7 +2,7 @@
 Database models for live halftime analysis.
 """
 from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,6 +11,8 @@ class LiveAnalysisSnapshot(Base):
     """Stores analysis snapshots taken at halftime."""
 
     __tablename__ = "live_analysis_snapshots"
+    # Fetch server defaults (snapshot_time) during the INSERT rather than lazily afterwards
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -24,8 +26,8 @@ class LiveAnalysisSnapshot(Base):
     period = Column(Integer, nullable=False)
     game_clock = Column(String, nullable=True)
 
-    # Full analysis data as JSON
-    analysis_data = Column(JSON, nullable=False)
+    # Full analysis data as JSON (large; deferred so only the detail view loads it)
+    analysis_data = deferred(Column(JSON, nullable=False), raiseload=True)
 
     # Summary metrics
     total_suggestions = Column(Integer, default=0)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -22,8 +22,7 @@ class PropBetResponse(PropBetCreate):
     team_name: Optional[str] = None
     game_id: Optional[int] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BetSlipCreate(BaseModel):
@@ -43,8 +42,13 @@ class BetSlipResponse(BaseModel):
     analyzed_at: Optional[datetime]
     prop_bets: List[PropBetResponse]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BetSlipPage(BaseModel):
+    """One page of a user's bet slips."""
+    items: List[BetSlipResponse]
+    total: int = Field(..., description="Total bet slips across all pages")
 
 
 class PropAnalysisDetail(BaseModel):
@@ -90,8 +94,7 @@ class AnalysisResponse(BaseModel):
     analysis_notes: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BetSlipWithAnalysis(BetSlipResponse):
@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import time
 from typing import List, Dict, Optional, Any, Tuple
@@ -19,6 +20,10 @@ class BallDontLieService:
         }
         self._cache: Dict[str, Tuple[Any, float]] = {}
         self._cache_ttl = 300  # 5 minutes
+        # Requests currently in flight, so concurrent misses on one key share a single call
+        self._pending: Dict[str, asyncio.Future] = {}
+        # One pooled client for the process, so requests reuse keep-alive connections
+        self._client: Optional[httpx.AsyncClient] = None
 
     async def _cached_request(self, cache_key: str, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Request with in-memory TTL cache to avoid duplicate API calls."""
@@ -28,19 +33,46 @@ class BallDontLieService:
             if now - cached_at < self._cache_ttl:
                 return cached_data
 
-        result = await self._make_request(endpoint, params)
-        self._cache[cache_key] = (result, now)
-        return result
+        pending = self._pending.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_and_cache(cache_key, endpoint, params))
+            self._pending[cache_key] = pending
+        # Shielded so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(pending)
+
+    async def _fetch_and_cache(self, cache_key: str, endpoint: str, params: Optional[Dict]) -> Dict:
+        """Make the request behind a cache miss and store the result."""
+        try:
+            result = await self._make_request(endpoint, params)
+            self._cache[cache_key] = (result, time.time())
+            return result
+        finally:
+            del self._pending[cache_key]
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Make an async HTTP request to the BallDontLie API."""
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers, params=params, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
+            response = await self._get_client().get(url, params=params)
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"API request failed: {e}")
             raise
@@ -72,7 +104,10 @@ class BallDontLieService:
             if last_name:
                 params["last_name"] = last_name
             
-            response = await self._make_request("/v1/players", params)
+            response = await self._cached_request(
+                f"player_search_{first_name}_{last_name}".lower(),
+                "/v1/players", params
+            )
             players = response.get("data", [])
             
             if players:
@@ -102,7 +137,10 @@ class BallDontLieService:
                 "per_page": limit
             }
             
-            response = await self._make_request("/v1/stats", params)
+            response = await self._cached_request(
+                f"player_stats_{player_id}_{limit}",
+                "/v1/stats", params
+            )
             return response.get("data", [])
             
         except Exception as e:
@@ -158,8 +196,7 @@ class BallDontLieService:
             Team data or None if not found
         """
         try:
-            response = await self._make_request("/v1/teams")
-            teams = response.get("data", [])
+            teams = await self.get_all_teams()
             
             name_lower = name.lower()
             
@@ -8,38 +8,51 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Read uploads 64KB at a time; a multiple of 3 keeps base64 chunks concatenable
+IMAGE_CHUNK_SIZE = 3 * 21845
+
 
 class ClaudeOCRService:
     """Service for using Claude to extract prop bets from bet slip images."""
     
     def __init__(self):
         # Note: Add ANTHROPIC_API_KEY to your .env file
-        self.client = anthropic.Anthropic(
+        self.client = anthropic.AsyncAnthropic(
             api_key=getattr(settings, 'ANTHROPIC_API_KEY', None)
         )
     
-    async def extract_props_from_image(self, image_data: bytes, mime_type: str) -> List[Dict]:
+    async def extract_props_from_image(self, image_file, mime_type: str) -> List[Dict]:
         """
         Extract prop bets from a bet slip image using Claude's vision capabilities.
         
         Args:
-            image_data: Image bytes
+            image_file: Uploaded image file (anything with an async ``read(size)``)
             mime_type: Image MIME type (e.g., 'image/jpeg')
             
         Returns:
             List of prop bet dictionaries
         """
-        try:
-            # Convert image to base64
-            base64_image = base64.b64encode(image_data).decode('utf-8')
-            
-            # Create the prompt for Claude
-            prompt = self._create_extraction_prompt()
+        # Convert image to base64 without buffering the raw upload
+        base64_image = await self.encode_image(image_file)
+        return await self.extract_props_from_base64(base64_image, mime_type)
+    
+    async def extract_props_from_base64(self, base64_image: str, mime_type: str) -> List[Dict]:
+        """
+        Extract prop bets from an already base64-encoded bet slip image.
+        
+        Args:
+            base64_image: Base64-encoded image data
+            mime_type: Image MIME type (e.g., 'image/jpeg')
             
-            # Call Claude API with vision
-            message = self.client.messages.create(
+        Returns:
+            List of prop bet dictionaries
+        """
+        try:
+            # Call Claude API with vision; the static instructions go in the system prompt
+            message = await self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=2000,
+                system=self._create_extraction_prompt(),
                 messages=[
                     {
                         "role": "user",
@@ -54,7 +67,7 @@ class ClaudeOCRService:
                             },
                             {
                                 "type": "text",
-                                "text": prompt
+                                "text": "Extract all props you can find in this bet slip image."
                             }
                         ]
                     }
@@ -74,9 +87,31 @@ class ClaudeOCRService:
             logger.error(f"Failed to extract props from image: {e}")
             raise
     
+    async def encode_image(self, image_file, max_size: Optional[int] = None) -> str:
+        """
+        Base64-encode an uploaded image chunk by chunk.
+        
+        Raises:
+            ValueError: If more than max_size bytes are read (checked as the upload streams in)
+        """
+        parts = []
+        pending = b""
+        total = 0
+        while chunk := await image_file.read(IMAGE_CHUNK_SIZE):
+            total += len(chunk)
+            if max_size is not None and total > max_size:
+                raise ValueError(f"Image exceeds {max_size} bytes")
+            pending += chunk
+            # Only encode whole 3-byte groups so no padding lands mid-stream
+            cut = len(pending) - len(pending) % 3
+            parts.append(base64.b64encode(pending[:cut]).decode('ascii'))
+            pending = pending[cut:]
+        parts.append(base64.b64encode(pending).decode('ascii'))
+        return "".join(parts)
+    
     def _create_extraction_prompt(self) -> str:
-        """Create the prompt for Claude to extract prop bets."""
-        return """Analyze this sports betting slip image and extract all the prop bets. 
+        """Create the static instructions for Claude to extract prop bets."""
+        return """Analyze sports betting slip images and extract all the prop bets. 
 
 For each prop bet you find, extract:
 1. Player name (full name)
@@ -103,9 +138,7 @@ Important:
 - For over_under, use lowercase: "over" or "under"
 - If opponent is not visible, omit the opponent_name field
 - Line should be a number (float or int)
-- Only include the JSON array, no other text
-
-Extract all props you can find in the image."""
+- Only include the JSON array, no other text"""
     
     def _parse_claude_response(self, response_text: str) -> List[Dict]:
         """Parse Claude's response to extract prop bet data."""
@@ -0,0 +1,73 @@
+import asyncio
+import base64
+import binascii
+import mimetypes
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ImageStorageService:
+    """Service for persisting uploaded bet slip images."""
+    
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self):
+        # Note: Set IMAGE_UPLOAD_DIR in your .env file to keep uploaded images
+        upload_dir = getattr(settings, 'IMAGE_UPLOAD_DIR', '')
+        self.base_dir = Path(upload_dir) if upload_dir else None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.base_dir is not None
+    
+    def image_key(self, bet_slip_id: int, mime_type: str) -> str:
+        """Build the storage key for a bet slip image."""
+        extension = mimetypes.guess_extension(mime_type) or ""
+        return f"bet_slips/{bet_slip_id}{extension}"
+    
+    async def upload_with_retry(self, key: str, base64_image: str) -> Optional[str]:
+        """
+        Store an image, retrying with exponential backoff.
+        
+        Args:
+            key: Storage key (relative path)
+            base64_image: Base64-encoded image data
+            
+        Returns:
+            Stored image location, or None if storage is disabled or every attempt failed
+        """
+        if not self.enabled:
+            return None
+        
+        # A malformed payload fails the same way on every attempt, so it is not retried
+        try:
+            image_bytes = await asyncio.to_thread(base64.b64decode, base64_image)
+        except (binascii.Error, ValueError) as e:
+            logger.error(f"Image upload for {key} failed: invalid base64 payload: {e}")
+            return None
+        
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                return await asyncio.to_thread(self._write, key, image_bytes)
+            except OSError as e:
+                logger.warning(f"Image upload attempt {attempt + 1} for {key} failed: {e}")
+                if attempt + 1 < self.MAX_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        
+        logger.error(f"Giving up on image upload for {key}")
+        return None
+    
+    def _write(self, key: str, image_bytes: bytes) -> str:
+        """Write an image to disk (runs in a worker thread)."""
+        path = self.base_dir / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(image_bytes)
+        return str(path)
+
+
+# Global instance
+image_storage_service = ImageStorageService()
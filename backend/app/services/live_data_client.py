@@ -3,10 +3,11 @@ Live NBA data client using nba_api library.
 Fetches real-time game data, box scores, and live player stats.
 """
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import asyncio
+import time
 from functools import lru_cache
 
 from nba_api.live.nba.endpoints import scoreboard, boxscore
@@ -83,13 +84,41 @@ class LiveGameData:
         """Combined score."""
         return self.home_score + self.away_score
 
+    def to_dict(self) -> Dict[str, Any]:
+        """LiveGameResponse-shaped dict (hand-written; faster than dataclasses.asdict)."""
+        return {
+            'game_id': self.game_id,
+            'game_status': self.game_status,
+            'game_status_text': self.game_status_text,
+            'period': self.period,
+            'game_clock': self.game_clock,
+            'home_team_id': self.home_team_id,
+            'home_team_name': self.home_team_name,
+            'home_team_abbr': self.home_team_abbr,
+            'home_score': self.home_score,
+            'away_team_id': self.away_team_id,
+            'away_team_name': self.away_team_name,
+            'away_team_abbr': self.away_team_abbr,
+            'away_score': self.away_score,
+            'game_date': self.game_date,
+            'game_time_utc': self.game_time_utc,
+            'is_halftime': self.is_halftime,
+            'score_differential': self.score_differential,
+            'total_score': self.total_score,
+        }
+
 
 class LiveDataClient:
     """Client for fetching live NBA game data using nba_api."""
 
+    # How often the background task refreshes the shared scoreboard
+    SCOREBOARD_REFRESH_SECONDS = 10
+
     def __init__(self):
         self.timeout = getattr(settings, 'NBA_API_TIMEOUT', 10)
         self._team_cache: Dict[int, Dict] = {}
+        # Last successful scoreboard fetch: (games, fetched_at)
+        self._scoreboard: Optional[Tuple[List[LiveGameData], float]] = None
         self._initialize_team_cache()
 
     def _initialize_team_cache(self):
@@ -225,6 +254,7 @@ class LiveDataClient:
                     is_halftime=is_halftime
                 ))
 
+            self._scoreboard = (games, time.time())
             logger.info(f"Fetched {len(games)} games for today")
             return games
 
@@ -232,16 +262,40 @@ class LiveDataClient:
             logger.error(f"Failed to fetch today's games: {e}")
             return []
 
+    async def get_game_by_id(self, game_id: str) -> Optional[LiveGameData]:
+        """Return a single game from the shared scoreboard snapshot, or None if not found."""
+        games = await self.get_cached_todays_games()
+        return next((g for g in games if g.game_id == game_id), None)
+
+    async def get_cached_todays_games(self) -> List[LiveGameData]:
+        """
+        Return today's games from the shared scoreboard snapshot.
+
+        The snapshot is kept fresh by refresh_scoreboard_loop; if it is missing or
+        stale (loop not running, upstream failing) the scoreboard is fetched directly.
+        """
+        if self._scoreboard:
+            games, fetched_at = self._scoreboard
+            if time.time() - fetched_at < 2 * self.SCOREBOARD_REFRESH_SECONDS:
+                return games
+        return await self.get_todays_games()
+
+    async def refresh_scoreboard_loop(self):
+        """Refresh the shared scoreboard snapshot until cancelled."""
+        while True:
+            await self.get_todays_games()
+            await asyncio.sleep(self.SCOREBOARD_REFRESH_SECONDS)
+
     async def get_halftime_games(self) -> List[LiveGameData]:
         """Fetch only games that are currently at halftime."""
-        games = await self.get_todays_games()
+        games = await self.get_cached_todays_games()
         halftime_games = [g for g in games if g.is_halftime]
         logger.info(f"Found {len(halftime_games)} games at halftime")
         return halftime_games
 
     async def get_live_games(self) -> List[LiveGameData]:
         """Fetch only games that are currently in progress."""
-        games = await self.get_todays_games()
+        games = await self.get_cached_todays_games()
         live_games = [g for g in games if g.game_status == 2]
         logger.info(f"Found {len(live_games)} live games")
         return live_games
@@ -442,30 +496,46 @@ class LiveDataClient:
         Aggregate individual player stats into team-level totals.
         Includes possession estimation using standard NBA formula.
         """
-        total_fga = sum(p.fg_attempted for p in players)
-        total_fta = sum(p.ft_attempted for p in players)
-        total_tov = sum(p.turnovers for p in players)
+        # One pass over the roster instead of a generator per stat
+        pts = reb = ast = stl = blk = tov = pf = 0
+        fgm = fga = fg3m = fg3a = ftm = fta = 0
+        minutes = 0
+        for p in players:
+            pts += p.points
+            reb += p.rebounds
+            ast += p.assists
+            stl += p.steals
+            blk += p.blocks
+            tov += p.turnovers
+            pf += p.fouls
+            fgm += p.fg_made
+            fga += p.fg_attempted
+            fg3m += p.fg3_made
+            fg3a += p.fg3_attempted
+            ftm += p.ft_made
+            fta += p.ft_attempted
+            minutes += p.minutes_float
 
         return {
-            'total_points': sum(p.points for p in players),
-            'total_rebounds': sum(p.rebounds for p in players),
-            'total_assists': sum(p.assists for p in players),
-            'total_steals': sum(p.steals for p in players),
-            'total_blocks': sum(p.blocks for p in players),
-            'total_turnovers': total_tov,
-            'total_fouls': sum(p.fouls for p in players),
-            'total_fg_made': sum(p.fg_made for p in players),
-            'total_fg_attempted': total_fga,
-            'total_fg3_made': sum(p.fg3_made for p in players),
-            'total_fg3_attempted': sum(p.fg3_attempted for p in players),
-            'total_ft_made': sum(p.ft_made for p in players),
-            'total_ft_attempted': total_fta,
-            'total_minutes': sum(p.minutes_float for p in players),
-            'team_fg_pct': (sum(p.fg_made for p in players) / max(total_fga, 1)) * 100,
-            'team_fg3_pct': (sum(p.fg3_made for p in players) / max(sum(p.fg3_attempted for p in players), 1)) * 100,
-            'team_ft_pct': (sum(p.ft_made for p in players) / max(total_fta, 1)) * 100,
+            'total_points': pts,
+            'total_rebounds': reb,
+            'total_assists': ast,
+            'total_steals': stl,
+            'total_blocks': blk,
+            'total_turnovers': tov,
+            'total_fouls': pf,
+            'total_fg_made': fgm,
+            'total_fg_attempted': fga,
+            'total_fg3_made': fg3m,
+            'total_fg3_attempted': fg3a,
+            'total_ft_made': ftm,
+            'total_ft_attempted': fta,
+            'total_minutes': minutes,
+            'team_fg_pct': (fgm / max(fga, 1)) * 100,
+            'team_fg3_pct': (fg3m / max(fg3a, 1)) * 100,
+            'team_ft_pct': (ftm / max(fta, 1)) * 100,
             # Standard possession estimation: Poss = FGA + 0.44 * FTA + TOV * 0.96
-            'estimated_possessions': total_fga + 0.44 * total_fta + total_tov * 0.96,
+            'estimated_possessions': fga + 0.44 * fta + tov * 0.96,
         }
 
 
@@ -0,0 +1,60 @@
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class PydanticResponse(JSONResponse):
+    """
+    JSON response for a Pydantic model.
+    
+    The model is serialized once by pydantic-core, skipping FastAPI's
+    response validation and jsonable_encoder pass. Pair with
+    ``model_construct`` when the data is already known to be valid.
+    """
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode("utf-8")
+
+
+def body_etag(body: bytes) -> str:
+    """Weak ETag over a rendered response body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header already names ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str = "private, no-cache") -> Response:
+    """Empty 304 response for a client that already holds the current representation."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    Tag an already-rendered response with an ETag, or swap it for a 304.
+    
+    Args:
+        request: Incoming request (checked for If-None-Match)
+        response: Rendered response whose body is hashed
+        cache_control: Cache-Control header to send
+        
+    Returns:
+        The response with ETag/Cache-Control set, or an empty 304 if the client's copy is current
+    """
+    etag = body_etag(response.body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
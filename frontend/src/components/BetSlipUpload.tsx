@@ -55,7 +55,7 @@ export default function BetSlipUpload({ onPropsExtracted }: BetSlipUploadProps)
         setError('No props could be extracted from the image. Please try manual input.');
       }
     } catch (err: any) {
-      setError(err.response?.data?.detail || 'Failed to upload and parse bet slip');
+      setError(err.response?.data?.detail || err.message || 'Failed to upload and parse bet slip');
     } finally {
       setUploading(false);
     }
@@ -1,6 +1,7 @@
 import axios, { AxiosInstance } from 'axios';
 import type {
   BetSlip,
+  BetSlipPage,
   BetSlipWithAnalysis,
   Analysis,
   LiveGame,
@@ -13,6 +14,8 @@ import type {
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const OCR_POLL_INTERVAL_MS = 1000;
+const OCR_POLL_MAX_ATTEMPTS = 60;
 
 class ApiService {
   private api: AxiosInstance;
@@ -41,12 +44,26 @@ class ApiService {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+
+    // OCR runs in the background; poll until the slip leaves 'ocr_pending'.
+    // The job dies with its worker, so give up rather than spin forever.
+    let betSlip: BetSlip = response.data;
+    for (let attempt = 0; betSlip.status === 'ocr_pending'; attempt++) {
+      if (attempt >= OCR_POLL_MAX_ATTEMPTS) {
+        throw new Error('Timed out waiting for the bet slip to be read. Please try again.');
+      }
+      await new Promise((resolve) => setTimeout(resolve, OCR_POLL_INTERVAL_MS));
+      betSlip = await this.getBetSlip(betSlip.id!);
+    }
+    if (betSlip.status === 'ocr_failed') {
+      throw new Error('The bet slip image could not be read. Please try another image or manual input.');
+    }
+    return betSlip;
   }
 
   async getBetSlips(): Promise<BetSlip[]> {
-    const response = await this.api.get<BetSlip[]>('/bets/');
-    return response.data;
+    const response = await this.api.get<BetSlipPage>('/bets/');
+    return response.data.items;
   }
 
   async getBetSlip(id: number): Promise<BetSlipWithAnalysis> {
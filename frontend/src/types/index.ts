@@ -49,6 +49,11 @@ export interface BetSlip {
   image_url?: string;
 }
 
+export interface BetSlipPage {
+  items: BetSlip[];
+  total: number;
+}
+
 // Game log for chart display
 export interface GameLogData {
   date: string;